@@ -0,0 +1,74 @@
+import time
+
+DEFAULT_MIN_BATCH_SIZE = 100
+DEFAULT_MAX_BATCH_SIZE = 50000
+# Slowest a single batch may be before the size is halved, in seconds.
+DEFAULT_TARGET_LATENCY = 0.5
+# A batch whose throughput is this fraction of the best seen still counts as "as fast".
+THROUGHPUT_TOLERANCE = 0.95
+
+
+def fixed_batches(total, batch_size):
+    """(start, stop) row ranges of batch_size rows."""
+    for start in range(0, total, batch_size):
+        yield start, min(start + batch_size, total)
+
+
+class AdaptiveBatchSize:
+    """Picks the size of each execute_values/COPY batch from how fast the previous batches were.
+
+    The size doubles while throughput keeps up, returns to the best size when a bigger batch was slower (and
+    stops growing past it), and halves whenever a batch takes longer than target_latency, which also forgets
+    what was learned so it can adapt to a changed server load. Sizes always stay within minimum and maximum.
+    """
+
+    def __init__(self, initial, minimum=DEFAULT_MIN_BATCH_SIZE, maximum=DEFAULT_MAX_BATCH_SIZE,
+                 target_latency=DEFAULT_TARGET_LATENCY):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.target_latency = target_latency
+        self.size = self.clamp(initial)
+        self.sizes = []
+        self._best_throughput = None
+        self._best_size = None
+        self._ceiling = None
+
+    def clamp(self, size):
+        return min(max(int(size), self.minimum), self.maximum)
+
+    def record(self, rows, seconds):
+        """Take the timing of a batch of rows into account for the next size."""
+        self.sizes.append(rows)
+        throughput = rows / seconds if seconds > 0 else float('inf')
+        if seconds > self.target_latency:
+            self.size = self.clamp(self.size // 2)
+            self._best_throughput = self._best_size = self._ceiling = None
+        elif self._best_throughput is None or throughput >= self._best_throughput * THROUGHPUT_TOLERANCE:
+            if self._best_throughput is None or throughput > self._best_throughput:
+                self._best_throughput, self._best_size = throughput, rows
+            grown = self.clamp(self.size * 2)
+            if self._ceiling is None or grown < self._ceiling:
+                self.size = grown
+        else:
+            self._ceiling = rows
+            self.size = self.clamp(self._best_size)
+
+    def batches(self, total):
+        """(start, stop) row ranges; the time until the caller asks for the next range is the batch's latency."""
+        start = 0
+        while start < total:
+            stop = min(start + self.size, total)
+            start_time = time.perf_counter()
+            yield start, stop
+            self.record(stop - start, time.perf_counter() - start_time)
+            start = stop
+
+    def summary(self):
+        """The sizes used, run-length encoded as [[size, batches], ...], for the run metrics."""
+        runs = []
+        for size in self.sizes:
+            if runs and runs[-1][0] == size:
+                runs[-1][1] += 1
+            else:
+                runs.append([size, 1])
+        return {'batch_sizes': runs}
@@ -0,0 +1,114 @@
+import json
+
+from translation_coverage_provider import fetch_translated_tables
+
+BILINGUAL_TABLE = "_bilingual_lines"
+BILINGUAL_COLUMNS = ('table_name', 'key', 'column_name', 'eng_text', 'jp_text')
+# Rows fetched per round trip by the export cursor and written per Parquet row group.
+EXPORT_BATCH_SIZE = 10000
+EXPORT_FORMATS = ('jsonl', 'parquet')
+
+
+def ensure_bilingual_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {BILINGUAL_TABLE} (
+            table_name TEXT,
+            key TEXT,
+            column_name TEXT,
+            eng_text TEXT,
+            jp_text TEXT
+        )
+    """)
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {BILINGUAL_TABLE}_table_idx ON {BILINGUAL_TABLE} (table_name)")
+
+
+def bilingual_select_query(table_name, key_column, pairs, existing_columns):
+    """Unpivot one table into a (table, key, column, eng_text, jp_text) row per translated cell."""
+    values = []
+    for eng_column, jp_column in pairs:
+        eng_text = f'"{eng_column}"' if eng_column in existing_columns else 'NULL'
+        values.append(f"('{eng_column}', {eng_text}, \"{jp_column}\")")
+    return f"""
+        SELECT '{table_name}', t."{key_column}", v.column_name, NULLIF(v.eng_text, 'NaN'), v.jp_text
+        FROM "{table_name}" t
+        CROSS JOIN LATERAL (VALUES {', '.join(values)}) v(column_name, eng_text, jp_text)
+        WHERE v.jp_text IS NOT NULL
+    """
+
+
+def refresh_bilingual_lines(conn, tables=None):
+    """Rebuild the bilingual rows of the given tables (every translated table by default).
+
+    Rows of tables that no longer have JP columns, e.g. ones just reloaded from ENG files, are removed.
+    """
+    cursor = conn.cursor()
+    ensure_bilingual_table(cursor)
+    if tables:
+        cursor.execute(f"DELETE FROM {BILINGUAL_TABLE} WHERE table_name = ANY(%s)",
+                       ([table.lower() for table in tables],))
+    else:
+        cursor.execute(f"TRUNCATE {BILINGUAL_TABLE}")
+
+    inserted = 0
+    for table_name, (key_column, pairs, existing_columns) in sorted(fetch_translated_tables(cursor, tables).items()):
+        query = bilingual_select_query(table_name, key_column, pairs, existing_columns)
+        cursor.execute(f"INSERT INTO {BILINGUAL_TABLE} ({', '.join(BILINGUAL_COLUMNS)}) {query}")
+        inserted += cursor.rowcount
+    conn.commit()
+    cursor.close()
+    print(f"Refreshed {inserted} bilingual lines in {BILINGUAL_TABLE}.")
+    return inserted
+
+
+def stream_bilingual_lines(conn, tables=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of bilingual rows from a server-side cursor, so exports never hold the whole table."""
+    cursor = conn.cursor(name='bilingual_export')
+    cursor.itersize = batch_size
+    query = f"SELECT {', '.join(BILINGUAL_COLUMNS)} FROM {BILINGUAL_TABLE}"
+    if tables:
+        cursor.execute(f"{query} WHERE table_name = ANY(%s) ORDER BY table_name, key",
+                       ([table.lower() for table in tables],))
+    else:
+        cursor.execute(f"{query} ORDER BY table_name, key")
+    while rows := cursor.fetchmany(batch_size):
+        yield rows
+    cursor.close()
+
+
+def write_jsonl(batches, path):
+    written = 0
+    with open(path, 'w', encoding='utf-8') as handle:
+        for rows in batches:
+            for row in rows:
+                handle.write(json.dumps(dict(zip(BILINGUAL_COLUMNS, row)), ensure_ascii=False) + '\n')
+            written += len(rows)
+    return written
+
+
+def write_parquet(batches, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from error
+
+    schema = pa.schema([(column, pa.string()) for column in BILINGUAL_COLUMNS])
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays([pa.array(column, pa.string()) for column in columns],
+                                                    schema=schema))
+            written += len(rows)
+    return written
+
+
+def export_bilingual_lines(conn, path, export_format=None, tables=None):
+    """Stream the bilingual rows to a JSONL or Parquet file; the format defaults to the file extension."""
+    export_format = export_format or ('parquet' if str(path).endswith('.parquet') else 'jsonl')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    writer = write_parquet if export_format == 'parquet' else write_jsonl
+    written = writer(stream_bilingual_lines(conn, tables), path)
+    print(f"Exported {written} bilingual lines to {path}.")
+    return written
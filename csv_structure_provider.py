@@ -1,6 +1,9 @@
 import os
+from fnmatch import fnmatch
 from pathlib import Path
 
+from language_provider import get_language
+
 class Config:
     BASE_CSV_DIR = None
     ENG_DIR = None
@@ -61,3 +64,31 @@ def list_quest_files_for_jp(csv_directory):
 def list_cutscene_files_for_jp(csv_directory):
     jp_ct_path = os.path.join(os.path.join(csv_directory, 'jp'), Config.CUTSCENE_DIR)
     return list_csv_files_in_directory(jp_ct_path)
+
+
+def matches_globs(relative_path, include=None, exclude=None):
+    """Check a path (relative to the language directory) against include and exclude globs.
+
+    A glob matches either the relative path, e.g. 'quest/000/*', or just the file name, e.g. 'VoiceMan_*'.
+    """
+    relative_path = Path(relative_path).as_posix()
+    file_name = os.path.basename(relative_path)
+
+    def matches(pattern):
+        return fnmatch(relative_path, pattern) or fnmatch(file_name, pattern)
+
+    if include and not any(matches(pattern) for pattern in include):
+        return False
+    return not (exclude and any(matches(pattern) for pattern in exclude))
+
+
+def list_files_for_language(language_name, csv_directory, categories=None, include=None, exclude=None):
+    """List the CSV files of a registered language in the given categories (quest and cut_scene by default)."""
+    language_path = os.path.join(csv_directory, get_language(language_name).directory)
+    categories = categories or [Config.QUEST_DIR, Config.CUTSCENE_DIR]
+    files = []
+    for category in categories:
+        for file_path in list_csv_files_in_directory(os.path.join(language_path, category)):
+            if matches_globs(os.path.relpath(file_path, language_path), include, exclude):
+                files.append(file_path)
+    return files
@@ -1,13 +1,23 @@
 import os
 
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 
 
-def connect_to_db():
-    return psycopg2.connect(
+def connection_parameters():
+    return dict(
         dbname=os.environ.get('DB_NAME'),
         user=os.environ.get('DB_USER'),
         password=os.environ.get('DB_PASSWORD'),
         host=os.environ.get('DB_HOST'),
         port=os.environ.get('DB_PORT')
     )
+
+
+def connect_to_db():
+    return psycopg2.connect(**connection_parameters())
+
+
+def create_connection_pool(max_connections, min_connections=1):
+    """Create a thread-safe pool of connections, one per worker."""
+    return ThreadedConnectionPool(min_connections, max_connections, **connection_parameters())
@@ -1,14 +1,19 @@
 import re
 
+# Marks lines the game data flags as unused or scheduled for deletion.
+UNUSED_PLACEHOLDER = "（★未使用／削除予定★）"
+# Hiragana, katakana and CJK ideographs.
+JAPANESE_PATTERN = re.compile('[\u3040-\u30FF\u4E00-\u9FFF]')
+
+
 def clean_text(text):
     if isinstance(text, str):
-        return text.replace("（★未使用／削除予定★）", "")
+        return text.replace(UNUSED_PLACEHOLDER, "")
     return text
 
 
 def is_japanese(text):
     if isinstance(text, str):
         cleaned_text = clean_text(text)
-        japanese_pattern = re.compile('[\u3040-\u30FF\u4E00-\u9FFF]')
-        return bool(japanese_pattern.search(cleaned_text))
+        return bool(JAPANESE_PATTERN.search(cleaned_text))
     return False
@@ -0,0 +1,74 @@
+import re
+
+from jptranslations_provider import UNUSED_PLACEHOLDER, JAPANESE_PATTERN, clean_text
+
+# Natural-language text in Latin scripts has lowercase letters; the identifiers the dumps put in text columns
+# (e.g. TEXT_CLSARC000_00021_000) don't.
+LATIN_PATTERN = re.compile('[a-z\u00DF-\u00F6\u00F8-\u00FF\u0153]')
+HAN_PATTERN = re.compile('[\u4E00-\u9FFF]')
+HANGUL_PATTERN = re.compile('[\u1100-\u11FF\u3130-\u318F\uAC00-\uD7A3]')
+
+
+class Language:
+    """A language of the datamining dumps.
+
+    The primary language (no column_suffix) creates the tables; every other language is merged into them as
+    <column><column_suffix> columns, for the columns whose cells script_pattern detects.
+    """
+
+    def __init__(self, name, directory, column_suffix=None, script_pattern=None):
+        self.name = name
+        self.directory = directory
+        self.column_suffix = column_suffix
+        self.script_pattern = script_pattern
+
+    @property
+    def is_primary(self):
+        return self.column_suffix is None
+
+    def column_name(self, sanitized_column):
+        """Name of the column that holds this language's text for a column sanitized by
+        sanitize_column_name_for_db."""
+        column_name = sanitized_column.replace('"', '')
+        return f"_{column_name}{self.column_suffix}"
+
+    def detects(self, text):
+        """True if a single cell is written in this language's script."""
+        return isinstance(text, str) and bool(self.script_pattern.search(clean_text(text)))
+
+    def detect(self, series):
+        """Vectorized detects(): a boolean Series, True for every cell written in this language's script."""
+        text = series.fillna('').astype(str).str.replace(UNUSED_PLACEHOLDER, '', regex=False)
+        return text.str.contains(self.script_pattern, regex=True)
+
+    def __repr__(self):
+        return f"Language({self.name!r})"
+
+
+LANGUAGE_REGISTRY = {}
+
+
+def register_language(language):
+    LANGUAGE_REGISTRY[language.name] = language
+    return language
+
+
+PRIMARY_LANGUAGE = register_language(Language('eng', 'eng')).name
+register_language(Language('jp', 'jp', '_JP', JAPANESE_PATTERN))
+register_language(Language('de', 'de', '_DE', LATIN_PATTERN))
+register_language(Language('fr', 'fr', '_FR', LATIN_PATTERN))
+register_language(Language('chs', 'chs', '_CHS', HAN_PATTERN))
+register_language(Language('ko', 'ko', '_KO', HANGUL_PATTERN))
+
+
+def get_language(name):
+    try:
+        return LANGUAGE_REGISTRY[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported language: {name}") from None
+
+
+def secondary_languages(names=None):
+    """The registered languages that are merged into the primary tables, optionally only the given ones."""
+    return [language for language in LANGUAGE_REGISTRY.values()
+            if not language.is_primary and (names is None or language.name in names)]
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from psycopg2 import errors
+
+from database_provider import connect_to_db, create_connection_pool
+from row_hash_provider import ROW_HASH_COLUMN
+from statement_cache_provider import statement_cache_for
+
+DEFAULT_CACHE_SIZE = 10000
+# Seconds a looked-up row is served from the cache; it is dropped earlier when the loader notifies a change.
+DEFAULT_TTL = 300
+DEFAULT_MAX_CONNECTIONS = 4
+# Channel the loader notifies with the name of every table it reloaded or merged into.
+TABLE_CHANGED_CHANNEL = 'table_changed'
+
+
+def notify_table_changed(cursor, table_name):
+    """Tell every DialogueLookup that a table changed. Postgres delivers it when the transaction commits."""
+    cursor.execute("SELECT pg_notify(%s, %s)", (TABLE_CHANGED_CHANNEL, table_name.lower()))
+
+
+class LookupCache:
+    """Size-bounded LRU cache of rows keyed by (table, key), where every entry expires after ttl seconds."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, table_name, key):
+        """Return (True, row) for a live entry, (False, None) otherwise. row may be None for a missing key."""
+        with self._lock:
+            entry = self.entries.get((table_name, key))
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self.entries[(table_name, key)]
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end((table_name, key))
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, table_name, key, row):
+        with self._lock:
+            self.entries[(table_name, key)] = (self.clock() + self.ttl, row)
+            self.entries.move_to_end((table_name, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate_table(self, table_name):
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self.entries if cache_key[0] == table_name]:
+                del self.entries[cache_key]
+
+
+class DialogueLookup:
+    """Read API for dialogue rows by (table, key), including the translated <col>_JP, <col>_DE, ... columns.
+
+    Lookups run on pooled autocommit connections through prepared statements and are served from a LRU/TTL
+    cache. A dedicated connection LISTENs for the loader's table_changed notifications; when a table is
+    reloaded or merged into, its cached rows are dropped and its query is prepared again, picking up new columns.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, cache_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL):
+        self.cache = LookupCache(cache_size, ttl)
+        # Keep every pooled connection open once returned, so its prepared statements are reused.
+        self.pool = create_connection_pool(max_connections, min_connections=max_connections)
+        self.listener = connect_to_db()
+        self.listener.autocommit = True
+        self.listener.cursor().execute(f"LISTEN {TABLE_CHANGED_CHANNEL}")
+        # table -> (generation, key column); a new generation makes every connection prepare the query again.
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._listener_lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        conn = self.pool.getconn()
+        # Autocommit, so idle lookups never hold locks that would block the loader's DROP or ALTER TABLE.
+        conn.autocommit = True
+        try:
+            yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def process_notifications(self):
+        """Invalidate the tables the loader has notified about since the last call."""
+        with self._listener_lock:
+            self.listener.poll()
+            notifies, self.listener.notifies[:] = list(self.listener.notifies), []
+        for notify in notifies:
+            self.invalidate_table(notify.payload)
+
+    def invalidate_table(self, table_name):
+        table_name = table_name.lower()
+        with self._lock:
+            generation = self._tables.get(table_name, (0, None))[0]
+            self._tables[table_name] = (generation + 1, None)
+        self.cache.invalidate_table(table_name)
+
+    def table_info(self, cursor, table_name):
+        with self._lock:
+            generation, key_column = self._tables.get(table_name, (0, None))
+        if key_column is None:
+            cursor.execute("""
+                SELECT column_name FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE table_schema = 'public' AND table_name = %s AND ordinal_position = 1
+            """, (table_name,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Error: Table '{table_name}' does not exist.")
+            key_column = row[0]
+            with self._lock:
+                self._tables[table_name] = (generation, key_column)
+        return generation, key_column
+
+    def fetch(self, conn, table_name, keys):
+        cursor = conn.cursor()
+        generation, key_column = self.table_info(cursor, table_name)
+
+        def build():
+            return f'SELECT * FROM "{table_name}" WHERE "{key_column}" = ANY($1)', ['TEXT[]']
+
+        statement_key = (table_name, 'lookup', generation)
+        try:
+            statement_cache_for(conn).execute(cursor, statement_key, build, [keys])
+        except errors.FeatureNotSupported:
+            # "cached plan must not change result type": columns were added before we heard about it.
+            self.invalidate_table(table_name)
+            generation, key_column = self.table_info(cursor, table_name)
+            statement_cache_for(conn).execute(cursor, (table_name, 'lookup', generation), build, [keys])
+        columns = [column.name for column in cursor.description]
+        rows = {}
+        for values in cursor.fetchall():
+            row = {column: value for column, value in zip(columns, values) if column != ROW_HASH_COLUMN}
+            rows[row[key_column]] = row
+        cursor.close()
+        return rows
+
+    def lookup_many(self, table_name, keys):
+        """Return {key: row dict or None} for the keys of a table, fetching the uncached ones in one query."""
+        self.process_notifications()
+        table_name = table_name.lower()
+        keys = [str(key) for key in keys]
+        found = {}
+        missing = []
+        for key in keys:
+            cached, row = self.cache.get(table_name, key)
+            if cached:
+                found[key] = row
+            else:
+                missing.append(key)
+        if missing:
+            with self.connection() as conn:
+                rows = self.fetch(conn, table_name, missing)
+            for key in missing:
+                found[key] = rows.get(key)
+                self.cache.put(table_name, key, found[key])
+        return {key: found[key] for key in keys}
+
+    def lookup(self, table_name, key):
+        """Return one row of a table as a dict, or None when the key doesn't exist."""
+        return self.lookup_many(table_name, [key])[str(key)]
+
+    def close(self):
+        self.listener.close()
+        self.pool.closeall()
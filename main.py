@@ -1,81 +1,545 @@
-# Example usage
+import argparse
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from csv_structure_provider import Config, list_files_for_language
+from language_provider import LANGUAGE_REGISTRY, PRIMARY_LANGUAGE, secondary_languages
+from batch_size_provider import DEFAULT_MIN_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE, DEFAULT_TARGET_LATENCY
+from metrics_provider import DEFAULT_METRICS_FILE, RunMetrics
+
+# pandas, numpy and psycopg2 are imported inside the subcommands that need them, so quick commands like
+# `scan` and `--help` start without paying for them.
+
+DEFAULT_BASE_DIR = str(Path(__file__).resolve().parent / 'rsrc' / 'csv')
+LANGUAGES = tuple(LANGUAGE_REGISTRY)
+CATEGORIES = (Config.QUEST_DIR, Config.CUTSCENE_DIR)
+LOAD_STRATEGIES = ('row', 'batch', 'copy', 'passthrough')
+TRANSACTION_POLICIES = ('batch', 'file', 'run')
+RUN_OPTION_NAMES = ('workers', 'batch_size', 'strategy', 'transaction', 'delta', 'refresh_bilingual', 'adaptive_batch',
+                    'min_batch_size', 'max_batch_size', 'batch_latency', 'retries', 'retry_delay',
+                    'merge_partitions', 'partition_rows')
+# Subcommands whose per-file timings are appended to the metrics file.
+METERED_COMMANDS = ('run', 'load', 'merge', 'merge-jp', 'bench', 'apply')
+
+
+def table_name_for(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def list_files(language, options):
+    return list_files_for_language(language, Config.BASE_CSV_DIR, options.category, options.include,
+                                   options.exclude)
+
+
+def load_eng_file(conn, file_path, options):
+    import pandas as pd
+    from sql_provider import create_table_from_df, insert_data_from_df, insert_data_from_df_batch, \
+        copy_data_from_df, sync_table_from_df, split_metadata_rows, load_table_name, swap_in_table
+    from row_hash_provider import ROW_HASH_COLUMN, compute_row_hashes, compute_rollup_hash, record_file_signature
+    from lookup_provider import notify_table_changed
+
+    table_name = table_name_for(file_path)
+    # Full loads fill a table of their own and swap it in, so the loaded table stays intact until they succeed.
+    load_table = load_table_name(table_name)
+    rollup_hash = None
+    comment_rows = 0
+    batch_sizer = None
+    if getattr(options, 'adaptive_batch', False) and options.strategy in ('batch', 'copy'):
+        from batch_size_provider import AdaptiveBatchSize
+
+        batch_sizer = AdaptiveBatchSize(options.batch_size, options.min_batch_size, options.max_batch_size,
+                                        options.batch_latency)
+    if options.strategy == 'passthrough' and not options.delta:
+        from passthrough_provider import copy_file_passthrough
+
+        rows, comment_rows = copy_file_passthrough(file_path, load_table, conn, options.transaction)
+        swap_in_table(conn, load_table, table_name)
+    else:
+        df = pd.read_csv(file_path)
+        data, data_types, comments = split_metadata_rows(df)
+        rows = len(data)
+        comment_rows = len(comments)
+        print(f"Read {rows} data rows from {file_path}, skipped {len(comments)} comment rows and "
+              f"{int(data_types is not None)} type row.")
+        if options.delta:
+            sync_table_from_df(data, table_name, conn, options.transaction)
+        else:
+            # Every row is stored with its hash, so later runs and detect_drift compare rows by hash alone.
+            row_hashes = compute_row_hashes(data)
+            rollup_hash = compute_rollup_hash(data, row_hashes)
+            df = df.assign(**{ROW_HASH_COLUMN: row_hashes})
+            data = df.loc[data.index]
+            create_table_from_df(df, load_table, conn, commit=options.transaction != 'run')
+            if options.strategy == 'row':
+                insert_data_from_df(data, load_table, conn, options.batch_size, options.transaction)
+            elif options.strategy == 'batch':
+                insert_data_from_df_batch(data, load_table, conn, options.batch_size, options.transaction,
+                                          batch_sizer)
+            else:
+                copy_data_from_df(data, load_table, conn, options.batch_size, options.transaction, batch_sizer)
+            swap_in_table(conn, load_table, table_name)
+
+    cursor = conn.cursor()
+    record_file_signature(cursor, table_name, file_path, rows, rollup_hash, keep_rollup_hash=options.delta,
+                          comment_rows=comment_rows)
+    notify_table_changed(cursor, table_name)
+    cursor.close()
+    if options.transaction != 'run':
+        conn.commit()
+    return rows, batch_sizer.summary() if batch_sizer else {}
+
+
+def merge_translation_files(conn, table_name, files_by_language, options, pool=None):
+    """Merge the files of all secondary languages of one table into it in a single pass.
+
+    Big tables are merged in options.merge_partitions key ranges concurrently: one on conn, the others on
+    connections from pool.
+    """
+    import pandas as pd
+    from sql_provider import merge_translations_from_dfs
+    from lookup_provider import notify_table_changed
+    from partitioned_merge_provider import planned_partitions, merge_translations_partitioned
+
+    dfs = {language: pd.read_csv(file_path) for language, file_path in files_by_language.items()}
+    rows = sum(len(df) for df in dfs.values())
+    extra = {}
+    partitions = planned_partitions(rows, vars(options))
+    if partitions > 1 and pool is not None:
+        _, extra['partitions'] = merge_translations_partitioned(dfs, table_name, partitions, conn, pool)
+    else:
+        merge_translations_from_dfs(dfs, table_name, conn, commit=False)
+    cursor = conn.cursor()
+    notify_table_changed(cursor, table_name)
+    cursor.close()
+    if options.transaction != 'run':
+        conn.commit()
+    return rows, extra
+
+
+def process_table(conn, table_name, files_by_language, options, pool=None):
+    """Load the primary language file of a table, or merge its secondary language files into it.
+
+    Returns the number of rows and a dict of extra fields for the run metrics.
+    """
+    if PRIMARY_LANGUAGE in files_by_language:
+        return load_eng_file(conn, files_by_language[PRIMARY_LANGUAGE], options)
+    return merge_translation_files(conn, table_name, files_by_language, options, pool)
+
+
+def group_files_by_table(files_by_language):
+    """[(table_name, {language: file_path}), ...] in the order the files are listed."""
+    tables = {}
+    for language, files in files_by_language.items():
+        for file_path in files:
+            tables.setdefault(table_name_for(file_path), {})[language] = file_path
+    return list(tables.items())
+
+
+def process_files(files, language, options):
+    """Process the files of one language; see process_tables."""
+    return process_tables(group_files_by_table({language: files}), options)
+
+
+def process_translations(files_by_language, options):
+    """Merge the files of several secondary languages, all languages of a table in one pass."""
+    return process_tables(group_files_by_table(files_by_language), options)
+
+
+def process_tables(tables, options):
+    """Run process_table over every (table_name, {language: file_path}) on options.workers threads, each with
+    its own pooled connection.
+
+    Connections are committed once more after all files are done, which is what makes the 'run'
+    transaction policy a single transaction per worker. With options.refresh_bilingual the bilingual rows of
+    the tables these files touched are rebuilt afterwards.
+
+    A file that fails with a transient error is replayed on a fresh connection, up to options.retries times.
+    Replays are safe because a full load fills a new table and only swaps it in when done, a delta load upserts
+    and a merge updates by key. With the 'run' policy a failed connection takes the other files of its transaction with
+    it, so nothing is retried there.
+    """
+    from database_provider import create_connection_pool
+    from profiling_provider import profile_phase
+    from retry_provider import DEFAULT_RETRIES, DEFAULT_RETRY_DELAY, retry_transient
+    from row_hash_provider import ensure_file_hash_table
+
+    metrics = getattr(options, 'metrics', None)
+    workers = max(options.workers, 1)
+    retries = getattr(options, 'retries', DEFAULT_RETRIES) if options.transaction != 'run' else 0
+    retry_delay = getattr(options, 'retry_delay', DEFAULT_RETRY_DELAY)
+    # A worker merging a big table in key ranges takes a connection for each range besides its own.
+    partitions = max(getattr(options, 'merge_partitions', 1), 1) if options.transaction != 'run' else 1
+    # Keep the range connections open between tables instead of reconnecting for each merge.
+    pool = create_connection_pool(workers * partitions, min_connections=workers * partitions)
+    local = threading.local()
+    connections = []
+
+    setup_conn = pool.getconn()
+    cursor = setup_conn.cursor()
+    ensure_file_hash_table(cursor)
+    cursor.close()
+    setup_conn.commit()
+    pool.putconn(setup_conn)
+
+    def worker_connection():
+        if not hasattr(local, 'conn'):
+            local.conn = pool.getconn()
+            connections.append(local.conn)
+        return local.conn
+
+    def discard_worker_connection():
+        # When connecting itself failed there is no connection to discard.
+        if not hasattr(local, 'conn'):
+            return
+        conn = local.conn
+        del local.conn
+        connections.remove(conn)
+        pool.putconn(conn, close=True)
+
+    def process(table):
+        table_name, files_by_language = table
+        print(f"Processing files: {', '.join(files_by_language.values())}")
+        start_time = time.perf_counter()
+        failures = []
+
+        def on_retry(error):
+            failures.append(error)
+            discard_worker_connection()
+
+        with profile_phase(options, f"{'+'.join(files_by_language)}:{table_name}"):
+            rows, extra = retry_transient(
+                lambda: process_table(worker_connection(), table_name, files_by_language, options, pool), retries,
+                retry_delay, on_retry)
+        if failures:
+            extra = dict(extra, retries=len(failures))
+        if metrics is not None:
+            record_table_metrics(metrics, table_name, files_by_language, rows, time.perf_counter() - start_time,
+                                 extra)
+        print(f"Processed {', '.join(files_by_language.values())} into table {table_name}.")
+        return rows
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rows = sum(executor.map(process, tables))
+        for conn in connections:
+            conn.commit()
+        # The workers hold every pooled connection, so hand them back before the refresh takes one.
+        while connections:
+            pool.putconn(connections.pop())
+        if getattr(options, 'refresh_bilingual', False):
+            from bilingual_provider import refresh_bilingual_lines
+
+            refresh_conn = pool.getconn()
+            refresh_bilingual_lines(refresh_conn, [table_name for table_name, _ in tables])
+            pool.putconn(refresh_conn)
+    finally:
+        for conn in connections:
+            pool.putconn(conn)
+        pool.closeall()
+    return rows
+
 
-import pandas as pd
+def record_table_metrics(metrics, table_name, files_by_language, rows, seconds, extra):
+    """Record every file of a table; when several languages were merged together, the time is split by file
+    size."""
+    sizes = {language: os.path.getsize(file_path) for language, file_path in files_by_language.items()}
+    total_size = sum(sizes.values())
+    for language, file_path in files_by_language.items():
+        share = sizes[language] / total_size if total_size else 1 / len(sizes)
+        file_rows = rows if len(sizes) == 1 else round(rows * share)
+        metrics.record_file(language, file_path, table_name, file_rows, seconds * share, **extra)
 
-from csv_structure_provider import list_quest_files_for_language, Config, list_quest_files_for_eng, \
-    list_cutscene_files_for_eng, list_quest_files_for_jp, list_cutscene_files_for_jp
-from database_provider import connect_to_db
-from sql_provider import create_table_from_df, insert_data_from_df, insert_data_from_df_with_japanese
 
+def process_csv_files(options=None):
+    """Load the ENG files and then merge the files of the other languages into the tables they created."""
+    options = options or build_parser().parse_args(['run'])
+    rows = 0
+    if PRIMARY_LANGUAGE in options.language:
+        rows += process_files(list_files(PRIMARY_LANGUAGE, options), PRIMARY_LANGUAGE, options)
+    files_by_language = {language.name: files for language in secondary_languages(options.language)
+                         if (files := list_files(language.name, options))}
+    if files_by_language:
+        # Translations should not make a new table.
+        print(f"~~~Starting {', '.join(files_by_language)} files~~~")
+        rows += process_translations(files_by_language, options)
+    return rows
+
+
+def scan_command(args):
+    for language in args.language:
+        files = list_files(language, args)
+        print(f"{language}: {len(files)} files")
+        if args.verbose:
+            for file_path in files:
+                print(f"  {file_path}")
+
+
+def run_command(args):
+    process_csv_files(args)
+
+
+def load_command(args):
+    process_files(list_files('eng', args), 'eng', args)
+
+
+def merge_jp_command(args):
+    process_files(list_files('jp', args), 'jp', args)
+
+
+def merge_command(args):
+    process_translations({language.name: list_files(language.name, args)
+                          for language in secondary_languages(args.language)}, args)
+
+
+def plan_command(args):
+    from database_provider import connect_to_db
+    from plan_provider import build_plan, print_plan, save_plan
+
+    files_by_language = {language: list_files(language, args) for language in args.language}
+    conn = None if args.offline else connect_to_db()
+    try:
+        plan = build_plan(files_by_language, run_options(args), conn, args.metrics_file)
+    finally:
+        if conn is not None:
+            conn.close()
+    print_plan(plan)
+    if args.output:
+        save_plan(plan, args.output)
+        print(f"Plan written to {args.output}")
+
+
+def apply_command(args):
+    """Execute exactly the steps of a saved plan, with the options it was planned for."""
+    from plan_provider import load_plan
+
+    plan = load_plan(args.plan)
+    options = argparse.Namespace(**plan['options'])
+    options.metrics = args.metrics
+    options.profiler = args.profiler
+    files_by_language = {}
+    for step in plan['steps']:
+        if step['action'] != 'skip':
+            files_by_language.setdefault(step['language'], []).append(step['file'])
+    if PRIMARY_LANGUAGE in files_by_language:
+        process_files(files_by_language.pop(PRIMARY_LANGUAGE), PRIMARY_LANGUAGE, options)
+    if files_by_language:
+        process_translations(files_by_language, options)
+
+
+def coverage_command(args):
+    from database_provider import connect_to_db
+    from translation_coverage_provider import compute_coverage, materialize_coverage, print_coverage
 
-def process_csv_files():
     conn = connect_to_db()
+    try:
+        print_coverage(compute_coverage(conn, args.table))
+        if args.materialize:
+            materialize_coverage(conn, args.table)
+    finally:
+        conn.close()
 
-    #TODO: This is repetitive. Please clean up, perhaps by making the list_(language) files to return a list of files, not a directory.
 
-    files = list_quest_files_for_eng(Config.BASE_CSV_DIR)
+def bilingual_command(args):
+    from database_provider import connect_to_db
+    from bilingual_provider import refresh_bilingual_lines, export_bilingual_lines
 
-    for file_path in files:
-        if os.path.isfile(file_path) and file_path.endswith(".csv"):
-            print(f"Processing file: {file_path}")
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
-            df = pd.read_csv(file_path)
-            create_table_from_df(df, table_name, conn)
-            insert_data_from_df(df, table_name, conn)
-            print(f"Processed {file_path} into table {table_name}.")
+    conn = connect_to_db()
+    try:
+        if args.refresh or not args.export:
+            refresh_bilingual_lines(conn, args.table)
+        if args.export:
+            export_bilingual_lines(conn, args.export, args.format, args.table)
+    finally:
+        conn.close()
 
-    files = list_cutscene_files_for_eng(Config.BASE_CSV_DIR)
 
-    for file_path in files:
-        if os.path.isfile(file_path) and file_path.endswith(".csv"):
-            print(f"Processing file: {file_path}")
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
-            df = pd.read_csv(file_path)
-            create_table_from_df(df, table_name, conn)
-            insert_data_from_df(df, table_name, conn)
-            print(f"Processed {file_path} into table {table_name}.")
+def status_command(args):
+    from database_provider import connect_to_db
+    from row_hash_provider import FILE_HASH_TABLE
 
-    #TODO: This is repetitive. Please clean up, perhaps by making the list_(language) files to return a list of files, not a directory.
+    scan_command(args)
+    conn = connect_to_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass(%s)", (FILE_HASH_TABLE,))
+        if cursor.fetchone()[0] is None:
+            print("No tables have been loaded yet.")
+        else:
+            cursor.execute(f"SELECT count(*), max(updated_at) FROM {FILE_HASH_TABLE}")
+            loaded_tables, last_load = cursor.fetchone()
+            print(f"Loaded tables: {loaded_tables} (last load {last_load})")
+        cursor.close()
+    finally:
+        conn.close()
 
-    # Jp should not make a new table.
-    print("~~~Starting JP files~~~")
 
-    files = list_quest_files_for_jp(Config.BASE_CSV_DIR)
+def bench_command(args):
+    files = list_files('eng', args)
+    files = files[:args.limit] if args.limit else files
+    start_time = time.perf_counter()
+    rows = process_files(files, 'eng', args)
+    elapsed_time = time.perf_counter() - start_time
+    print(f"Loaded {rows} rows from {len(files)} files in {elapsed_time:.2f} seconds "
+          f"({rows / elapsed_time if elapsed_time else 0:.0f} rows/s) with {args.workers} workers, "
+          f"strategy {args.strategy}, batch size {args.batch_size}, transaction per {args.transaction}")
 
-    for file_path in files:
-        if os.path.isfile(file_path) and file_path.endswith(".csv"):
-            print(f"Processing file: {file_path}")
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
-            df = pd.read_csv(file_path)
-            insert_data_from_df_with_japanese(df, table_name, conn)
-            print(f"Processed {file_path} into table {table_name}.")
 
-    files = list_cutscene_files_for_jp(Config.BASE_CSV_DIR)
+def run_options(args):
+    """The performance options of a run, as stored in plans and run metrics."""
+    return {name: getattr(args, name) for name in RUN_OPTION_NAMES if hasattr(args, name)}
 
-    for file_path in files:
-        if os.path.isfile(file_path) and file_path.endswith(".csv"):
-            print(f"Processing file: {file_path}")
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
-            df = pd.read_csv(file_path)
-            insert_data_from_df_with_japanese(df, table_name, conn)
-            print(f"Processed {file_path} into table {table_name}.")
 
+def build_parser():
+    parser = argparse.ArgumentParser(description="Load FFXIV datamining CSV files into PostgreSQL.")
+    parser.add_argument('--base-dir', default=os.environ.get('CSV_BASE_DIR', DEFAULT_BASE_DIR),
+                        help="Directory that contains the eng/ and jp/ CSV trees.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile every file with cProfile and tracemalloc and write reports to --profile-dir.")
+    parser.add_argument('--profile-dir', default='profiles', help="Where --profile writes its reports.")
+    parser.add_argument('--profile-trace', action='store_true',
+                        help="With --profile, also write collapsed stacks for speedscope or flamegraph.pl.")
+    parser.add_argument('--metrics-file', default=os.environ.get('LOAD_METRICS_FILE', DEFAULT_METRICS_FILE),
+                        help="JSON lines file that per-file timings are appended to and estimates are read from.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
 
-    conn.close()
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--category', nargs='+', choices=CATEGORIES, default=list(CATEGORIES),
+                           help="Categories to process.")
+    selection.add_argument('--include', nargs='+', metavar='GLOB',
+                           help="Only process files whose path (e.g. 'quest/000/*') or name matches a glob.")
+    selection.add_argument('--exclude', nargs='+', metavar='GLOB', help="Skip files matching any of these globs.")
 
-import time
+    languages = argparse.ArgumentParser(add_help=False)
+    languages.add_argument('--language', nargs='+', choices=LANGUAGES, default=list(LANGUAGES),
+                           help="Languages to process.")
 
-if __name__ == "__main__":
-    base_dir = r'C:\Users\sbelknap\PycharmProjects\dialogdbconn\rsrc\csv'
-    Config.initialize_language_base_directories(base_dir)
+    performance = argparse.ArgumentParser(add_help=False)
+    performance.add_argument('--workers', type=int, default=1, help="Files processed concurrently.")
+    performance.add_argument('--batch-size', type=int, default=1000,
+                             help="Rows per INSERT batch or COPY chunk.")
+    performance.add_argument('--strategy', choices=LOAD_STRATEGIES, default='row',
+                             help="How ENG rows are written: one INSERT per row, multi-row INSERTs, COPY from a "
+                                  "DataFrame, or passthrough: the raw file streamed into COPY with only the header "
+                                  "sanitized and metadata rows dropped (ignored with --delta).")
+    performance.add_argument('--adaptive-batch', action='store_true',
+                             help="Grow or shrink the batch/copy batch size per file from measured batch latency "
+                                  "and throughput, starting at --batch-size.")
+    performance.add_argument('--min-batch-size', type=int, default=DEFAULT_MIN_BATCH_SIZE,
+                             help="Smallest batch --adaptive-batch may pick.")
+    performance.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                             help="Largest batch --adaptive-batch may pick.")
+    performance.add_argument('--batch-latency', type=float, default=DEFAULT_TARGET_LATENCY,
+                             help="Seconds a batch may take before --adaptive-batch halves the size.")
+    performance.add_argument('--retries', type=int, default=3,
+                             help="Times a file is replayed on a fresh connection after a transient error "
+                                  "(connection reset, serialization failure, deadlock). Not with --transaction run.")
+    performance.add_argument('--retry-delay', type=float, default=0.5,
+                             help="Seconds before the first retry; each further retry waits twice as long.")
+    performance.add_argument('--merge-partitions', type=int, default=1,
+                             help="Merge big tables in this many key ranges at once, each on its own connection. "
+                                  "Not with --transaction run.")
+    performance.add_argument('--partition-rows', type=int, default=100000,
+                             help="Rows in a table's translation files from which --merge-partitions applies.")
+    performance.add_argument('--transaction', choices=TRANSACTION_POLICIES, default='file',
+                             help="Commit after every batch, every file or once per run.")
+    performance.add_argument('--delta', action='store_true', help="Upsert only changed rows instead of reloading.")
+    performance.add_argument('--refresh-bilingual', action='store_true',
+                             help="Afterwards rebuild the _bilingual_lines rows of the tables that were touched.")
 
-    start_time = time.time()
+    scan_parser = subparsers.add_parser('scan', parents=[selection, languages],
+                                        help="List the CSV files that would be processed.")
+    scan_parser.add_argument('-v', '--verbose', action='store_true', help="Print every file path.")
+    scan_parser.set_defaults(handler=scan_command)
+
+    run_parser = subparsers.add_parser('run', parents=[selection, languages, performance],
+                                       help="Load the ENG files and merge the files of the other languages.")
+    run_parser.set_defaults(handler=run_command)
+
+    load_parser = subparsers.add_parser('load', parents=[selection, performance],
+                                        help="Load the ENG files into tables.")
+    load_parser.set_defaults(handler=load_command)
+
+    merge_parser = subparsers.add_parser('merge-jp', parents=[selection, performance],
+                                         help="Merge the JP files into the existing tables.")
+    merge_parser.set_defaults(handler=merge_jp_command)
+
+    merge_all_parser = subparsers.add_parser('merge', parents=[selection, languages, performance],
+                                             help="Merge the files of every selected secondary language into the "
+                                                  "existing tables, all languages of a table in one pass.")
+    merge_all_parser.set_defaults(handler=merge_command)
+
+    plan_parser = subparsers.add_parser('plan', parents=[selection, languages, performance],
+                                        help="Estimate what a run would do, reading only file headers.")
+    plan_parser.add_argument('-o', '--output', help="Write the plan as JSON so `apply` can execute it.")
+    plan_parser.add_argument('--offline', action='store_true', help="Don't look at the database.")
+    plan_parser.set_defaults(handler=plan_command)
+
+    apply_parser = subparsers.add_parser('apply', help="Execute a plan written by `plan --output`.")
+    apply_parser.add_argument('plan', help="Plan JSON file.")
+    apply_parser.set_defaults(handler=apply_command)
+
+    coverage_parser = subparsers.add_parser('coverage', help="Report JP translation coverage computed in SQL.")
+    coverage_parser.add_argument('--table', nargs='+', help="Only these tables (all translated tables by default).")
+    coverage_parser.add_argument('--materialize', action='store_true',
+                                 help="Also store the result in the _translation_coverage table.")
+    coverage_parser.set_defaults(handler=coverage_command)
+
+    bilingual_parser = subparsers.add_parser('bilingual',
+                                             help="Rebuild and export the (table, key, column, ENG, JP) lines.")
+    bilingual_parser.add_argument('--table', nargs='+', help="Only these tables (all translated tables by default).")
+    bilingual_parser.add_argument('--refresh', action='store_true',
+                                  help="Rebuild the _bilingual_lines rows first (the default without --export).")
+    bilingual_parser.add_argument('--export', metavar='PATH', help="Stream the lines to a JSONL or Parquet file.")
+    bilingual_parser.add_argument('--format', choices=('jsonl', 'parquet'),
+                                  help="Export format (by default from the file extension).")
+    bilingual_parser.set_defaults(handler=bilingual_command)
 
-    # Main method.
-    process_csv_files()
-    # # #
+    status_parser = subparsers.add_parser('status', parents=[selection, languages],
+                                          help="Show file counts and what has been loaded.")
+    status_parser.set_defaults(handler=status_command, verbose=False)
 
+    bench_parser = subparsers.add_parser('bench', parents=[selection, performance],
+                                         help="Time a load of the ENG files.")
+    bench_parser.add_argument('--limit', type=int, default=0, help="Only load the first N files.")
+    bench_parser.set_defaults(handler=bench_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    Config.initialize_language_base_directories(args.base_dir)
+    if args.profile and getattr(args, 'workers', 1) > 1:
+        print("--profile profiles one file at a time, running with --workers 1.")
+        args.workers = 1
+
+    if args.command in METERED_COMMANDS:
+        args.metrics = RunMetrics(args.command, run_options(args))
+
+    args.profiler = None
+    if args.profile:
+        from profiling_provider import Profiler
+        # Import the loader before tracing starts, so the first file's report isn't all import cost.
+        import sql_provider  # noqa: F401
+
+        args.profiler = Profiler(args.profile_dir, trace=args.profile_trace)
+        args.profiler.start()
+
+    start_time = time.time()
+    try:
+        args.handler(args)
+    finally:
+        if args.profiler:
+            args.profiler.stop()
     end_time = time.time()
+    if args.command in METERED_COMMANDS:
+        args.metrics.save(args.metrics_file)
     elapsed_time = end_time - start_time
     print(f"Elapsed time: {elapsed_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_METRICS_FILE = str(Path(__file__).resolve().parent / 'load_metrics.jsonl')
+# How many of the most recent runs are averaged when estimating throughput.
+THROUGHPUT_HISTORY = 10
+
+
+class RunMetrics:
+    """Collects per-file timings for one run and appends them as a single JSON line to the metrics file."""
+
+    def __init__(self, command, options=None):
+        self.command = command
+        self.options = options or {}
+        self.started_at = time.time()
+        self.files = []
+        self._lock = threading.Lock()
+
+    def record_file(self, language, file_path, table_name, rows, seconds, **extra):
+        entry = {
+            'language': language,
+            'file': file_path,
+            'table': table_name,
+            'rows': rows,
+            'bytes': os.path.getsize(file_path),
+            'seconds': round(seconds, 6),
+        }
+        entry.update(extra)
+        with self._lock:
+            self.files.append(entry)
+
+    def summary(self):
+        summary = {}
+        for entry in self.files:
+            totals = summary.setdefault(entry['language'], {'files': 0, 'rows': 0, 'bytes': 0, 'seconds': 0.0})
+            totals['files'] += 1
+            totals['rows'] += entry['rows']
+            totals['bytes'] += entry['bytes']
+            totals['seconds'] += entry['seconds']
+        return summary
+
+    def save(self, metrics_file=DEFAULT_METRICS_FILE):
+        if not self.files:
+            return
+        record = {
+            'command': self.command,
+            'options': self.options,
+            'started_at': self.started_at,
+            'elapsed': round(time.time() - self.started_at, 6),
+            'summary': self.summary(),
+            'files': self.files,
+        }
+        with open(metrics_file, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(record) + '\n')
+        print(f"Run metrics appended to {metrics_file}")
+
+
+def load_runs(metrics_file=DEFAULT_METRICS_FILE):
+    if not os.path.exists(metrics_file):
+        return []
+    with open(metrics_file, encoding='utf-8') as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def recorded_throughput(language, metrics_file=DEFAULT_METRICS_FILE):
+    """Average bytes per second for a language over the most recent runs, or None without history."""
+    total_bytes = 0
+    total_seconds = 0.0
+    for run in load_runs(metrics_file)[-THROUGHPUT_HISTORY:]:
+        totals = run.get('summary', {}).get(language)
+        if totals:
+            total_bytes += totals['bytes']
+            total_seconds += totals['seconds']
+    return total_bytes / total_seconds if total_seconds else None
@@ -0,0 +1,139 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from sql_provider import staged_translations, add_translation_columns, stage_translation_rows, \
+    translation_update_query
+
+# Tables with fewer rows in their translation files than this are merged on a single connection.
+DEFAULT_PARTITION_ROWS = 100000
+
+
+def planned_partitions(rows, options):
+    """Key ranges a merge of this many file rows is split into with the given run options."""
+    partitions = options.get('merge_partitions', 1) or 1
+    if options.get('transaction') == 'run' or rows < options.get('partition_rows', DEFAULT_PARTITION_ROWS):
+        return 1
+    return partitions
+
+
+def ensure_key_index(cursor, table_name, key_column):
+    """Index the key column, which the partial UPDATEs join and range-filter on."""
+    table_name_lower = table_name.lower()
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS "{table_name_lower}_key_idx" '
+                   f'ON "{table_name_lower}" ("{key_column}")')
+
+
+def key_range_bounds(cursor, table_name, key_column, partitions):
+    """Upper key of each of up to `partitions` ranges holding about the same number of rows, in key order.
+
+    The boundaries come from Postgres itself (ntile over the key index), so ranges follow the database's
+    collation rather than Python's string order.
+    """
+    cursor.execute(f"""
+        SELECT max(k) FROM (
+            SELECT "{key_column}" AS k, ntile(%s) OVER (ORDER BY "{key_column}") AS part
+            FROM "{table_name.lower()}" WHERE "{key_column}" IS NOT NULL
+        ) keys
+        GROUP BY part ORDER BY 1
+    """, (partitions,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def key_ranges(bounds):
+    """[(lower, upper), ...] covering every key: lower exclusive, upper inclusive, None meaning unbounded."""
+    lowers = [None] + bounds[:-1]
+    uppers = bounds[:-1] + [None]
+    return list(zip(lowers, uppers))
+
+
+def key_range_condition(key_column, lower, upper):
+    condition = ''
+    if lower is not None:
+        condition += f' AND t."{key_column}" > %(lower)s'
+    if upper is not None:
+        condition += f' AND t."{key_column}" <= %(upper)s'
+    return condition
+
+
+def rollback_quietly(conn):
+    """Roll back a connection that may already be broken; its transaction is gone with it then."""
+    try:
+        conn.rollback()
+    except psycopg2.Error as error:
+        print(f"Rollback failed ({type(error).__name__}: {str(error).strip()})")
+
+
+def merge_translations_partitioned(dfs_by_language, table_name, partitions, conn, pool):
+    """Merge the translation files of a big table with `partitions` concurrent UPDATEs over key ranges.
+
+    The translated columns are added, the key index created and the cells staged in an unlogged table on conn,
+    all committed up front so every connection sees them. The first key range is then updated on conn and each
+    other range on a connection from pool. Only when all partial UPDATEs succeeded are they committed, one after
+    the other; if any failed, all are rolled back. This is not a two-phase commit: should a commit itself fail
+    midway, some ranges are merged and others not, but the merge only ever sets values from the files, so
+    running it again completes it. Returns (rows updated, partition plan).
+    """
+    key_column, staged = staged_translations(dfs_by_language)
+    if staged.empty:
+        print(f"No translated text found for {table_name}.")
+        return 0, []
+
+    translated_columns = list(staged.columns)
+    stage_table = f"{table_name.lower()}_translations_stage"
+    connections = [conn]
+    try:
+        cursor = conn.cursor()
+        add_translation_columns(cursor, table_name, translated_columns)
+        ensure_key_index(cursor, table_name, key_column)
+        cursor.execute(f"DROP TABLE IF EXISTS {stage_table}")
+        stage_translation_rows(cursor, stage_table, key_column, staged, temporary=False)
+        cursor.execute(f'CREATE INDEX ON {stage_table} ("{key_column}")')
+        cursor.execute(f"ANALYZE {stage_table}")
+        bounds = key_range_bounds(cursor, table_name, key_column, partitions)
+        conn.commit()
+
+        plan = [{'lower': lower, 'upper': upper} for lower, upper in key_ranges(bounds)]
+        print(f"Merging {table_name} in {len(plan)} key ranges split at {bounds[:-1]}")
+        for _ in plan[1:]:
+            connections.append(pool.getconn())
+
+        def merge_range(step, range_conn):
+            start_time = time.perf_counter()
+            range_cursor = range_conn.cursor()
+            query = translation_update_query(table_name, stage_table, key_column, translated_columns,
+                                             key_range_condition(key_column, step['lower'], step['upper']))
+            range_cursor.execute(query, step)
+            step['rows'] = range_cursor.rowcount
+            step['seconds'] = round(time.perf_counter() - start_time, 6)
+            range_cursor.close()
+
+        with ThreadPoolExecutor(max_workers=len(plan)) as executor:
+            futures = [executor.submit(merge_range, step, range_conn)
+                       for step, range_conn in zip(plan, connections)]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        for range_conn in connections:
+            if errors:
+                rollback_quietly(range_conn)
+            else:
+                range_conn.commit()
+        if errors:
+            raise errors[0]
+
+        updated = sum(step['rows'] for step in plan)
+        for step in plan:
+            print(f"  ({step['lower']}, {step['upper']}]: {step['rows']} rows in {step['seconds']:.3f}s")
+        print(f"Merged {', '.join(dfs_by_language)} text into {updated} rows of {table_name}.")
+        return updated, plan
+    finally:
+        for range_conn in connections[1:]:
+            pool.putconn(range_conn)
+        # Cleanup must not hide the error that got us here; a stage table left behind is dropped by the next merge.
+        try:
+            conn.rollback()
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {stage_table}")
+            conn.commit()
+        except psycopg2.Error as error:
+            print(f"Could not drop {stage_table} ({type(error).__name__}: {str(error).strip()})")
@@ -0,0 +1,102 @@
+import csv
+import io
+
+from sql_provider import sanitize_column_name, create_table_from_columns, is_metadata_marker, finish_file
+
+# Bytes read from the CSV file, and handed to COPY, at a time.
+CHUNK_SIZE = 1024 * 1024
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class PassthroughReader:
+    """File-like object that streams a CSV file to COPY without parsing it into a DataFrame.
+
+    The header is read and parsed up front (self.columns); after that the raw bytes are split into records in
+    large chunks, tracking quotes so line breaks inside quoted cells stay in their record, and comment and type
+    rows are dropped. Everything else is passed through untouched.
+    """
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE):
+        self.handle = open(file_path, 'rb')
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.skipped = 0
+        self.comments = 0
+        self._pending = bytearray()
+        self._records = self._raw_records()
+        header = next(self._records, b'')
+        self.columns = next(csv.reader(io.StringIO(header.removeprefix(UTF8_BOM).decode('utf-8'))), [])
+        self._chunks = self._filtered_chunks()
+
+    def _raw_records(self):
+        record = bytearray()
+        in_quotes = False
+        while chunk := self.handle.read(self.chunk_size):
+            pieces = chunk.split(b'\n')
+            for index, piece in enumerate(pieces):
+                ends_line = index < len(pieces) - 1
+                record += piece + b'\n' if ends_line else piece
+                if piece.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                if ends_line and not in_quotes:
+                    yield bytes(record)
+                    record.clear()
+        if record.strip():
+            yield bytes(record if record.endswith(b'\n') else record + b'\n')
+
+    def _filtered_chunks(self):
+        kept = []
+        kept_size = 0
+        for record in self._records:
+            first_cell = record.split(b',', 1)[0].strip().strip(b'"').decode('utf-8', 'replace')
+            if is_metadata_marker(first_cell) or not record.strip():
+                self.skipped += 1
+                self.comments += first_cell.startswith('#')
+                continue
+            self.rows += 1
+            kept.append(record)
+            kept_size += len(record)
+            if kept_size >= self.chunk_size:
+                yield b''.join(kept)
+                kept, kept_size = [], 0
+        if kept:
+            yield b''.join(kept)
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending += chunk
+        if size < 0:
+            size = len(self._pending)
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def copy_file_passthrough(file_path, table_name, conn, transaction='file'):
+    """Create the table from the file's header and COPY the file's data rows straight into it.
+
+    Empty cells arrive as NULL, where the DataFrame loaders store them as 'NaN'. Returns the number of rows copied
+    and the number of comment rows skipped.
+    """
+    reader = PassthroughReader(file_path)
+    try:
+        create_table_from_columns(reader.columns, [None] * len(reader.columns), table_name, conn,
+                                  commit=transaction != 'run')
+        sanitized_columns = [sanitize_column_name(col) for col in reader.columns]
+        copy_query = f"COPY {table_name} ({', '.join(sanitized_columns)}) FROM STDIN WITH (FORMAT csv)"
+        print(f"Passthrough copy query: {copy_query}")
+        cursor = conn.cursor()
+        cursor.copy_expert(copy_query, reader, size=CHUNK_SIZE)
+        cursor.close()
+    finally:
+        reader.close()
+
+    finish_file(conn, transaction)
+    print(f"Copied {reader.rows} rows into {table_name}, skipped {reader.skipped} metadata rows.")
+    return reader.rows, reader.comments
@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+import os
+import time
+
+from language_provider import PRIMARY_LANGUAGE, get_language
+from metrics_provider import DEFAULT_METRICS_FILE, recorded_throughput
+from partitioned_merge_provider import planned_partitions
+from row_hash_provider import fetch_file_signatures
+from sql_provider import sanitize_column_name, sanitize_column_name_for_db, is_metadata_marker
+
+PLAN_VERSION = 2
+# Rows read from the top of a file to guess which columns hold translated text and how large a row is.
+SAMPLE_ROWS = 200
+
+
+def read_csv_head(file_path, rows):
+    """Read the header and the first rows of a CSV file without loading the rest of it."""
+    head = []
+    with open(file_path, newline='', encoding='utf-8') as handle:
+        for row in csv.reader(handle):
+            head.append(row)
+            if len(head) > rows:
+                break
+    return head
+
+
+def record_size(row):
+    """Bytes a parsed CSV record takes in the file, give or take quoting and line endings."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(row)
+    return len(buffer.getvalue().encode('utf-8'))
+
+
+def estimate_row_count(file_path, head):
+    """Estimate the data rows of a file from what read_csv_head(file_path, SAMPLE_ROWS) returned.
+
+    A sample that reached the end of the file is counted exactly. Otherwise the file size, less the header and
+    metadata rows, is divided by the average size of the sampled data rows. Comment and type rows never count.
+    """
+    records = [row for row in head[1:] if row]
+    metadata = [row for row in records if is_metadata_marker(row[0])]
+    data = [row for row in records if not is_metadata_marker(row[0])]
+    if len(head) <= SAMPLE_ROWS or not data:
+        return len(data)
+    metadata_bytes = sum(record_size(row) for row in [head[0]] + metadata)
+    average_bytes = sum(record_size(row) for row in data) / len(data)
+    return max(round((os.path.getsize(file_path) - metadata_bytes) / average_bytes), len(data))
+
+
+def fetch_existing_columns(cursor):
+    """Return {table_name: set of column names} for every table in the public schema."""
+    cursor.execute("""
+        SELECT table_name, column_name FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE table_schema = 'public'
+    """)
+    existing = {}
+    for table_name, column_name in cursor.fetchall():
+        existing.setdefault(table_name, set()).add(column_name)
+    return existing
+
+
+def plan_eng_file(file_path, existing_columns, signatures, delta):
+    table_name = os.path.splitext(os.path.basename(file_path))[0]
+    head = read_csv_head(file_path, SAMPLE_ROWS)
+    header = head[0]
+    stat = os.stat(file_path)
+    table_exists = table_name.lower() in existing_columns
+
+    signature = signatures.get(table_name.lower())
+    if table_exists and signature == (stat.st_size, stat.st_mtime):
+        action = 'skip'
+    elif delta:
+        action = 'sync'
+    else:
+        action = 'replace' if table_exists else 'create'
+
+    return {
+        'language': PRIMARY_LANGUAGE,
+        'file': file_path,
+        'table': table_name,
+        'action': action,
+        'columns': [sanitize_column_name(col) for col in header],
+        'rows': estimate_row_count(file_path, head),
+        'bytes': stat.st_size,
+    }
+
+
+def plan_translation_file(file_path, existing_columns, language):
+    table_name = os.path.splitext(os.path.basename(file_path))[0]
+    head = read_csv_head(file_path, SAMPLE_ROWS)
+    header, sample = head[0], head[1:]
+
+    translated_columns = []
+    for index, col in enumerate(header[1:], start=1):
+        if any(index < len(row) and language.detects(row[index])
+               for row in sample if not is_metadata_marker(row[0])):
+            translated_columns.append(language.column_name(sanitize_column_name_for_db(col)))
+    present = existing_columns.get(table_name.lower(), set())
+
+    return {
+        'language': language.name,
+        'file': file_path,
+        'table': table_name,
+        'action': 'merge',
+        'columns': translated_columns,
+        'columns_to_add': [col for col in translated_columns if col not in present],
+        'rows': estimate_row_count(file_path, head),
+        'bytes': os.path.getsize(file_path),
+    }
+
+
+def build_plan(files_by_language, options, conn=None, metrics_file=DEFAULT_METRICS_FILE):
+    """Describe what a run would do without touching any data.
+
+    files_by_language maps language names to file lists; options are the run options the executor should reuse.
+    Without a connection every ENG table is planned as new and every translated column as missing.
+    """
+    existing_columns, signatures = {}, {}
+    if conn is not None:
+        cursor = conn.cursor()
+        existing_columns = fetch_existing_columns(cursor)
+        signatures = fetch_file_signatures(cursor)
+        cursor.close()
+
+    delta = options.get('delta', False)
+    steps = [plan_eng_file(file_path, existing_columns, signatures, delta)
+             for file_path in files_by_language.get(PRIMARY_LANGUAGE, [])]
+    for language_name, files in files_by_language.items():
+        if language_name != PRIMARY_LANGUAGE:
+            language = get_language(language_name)
+            steps += [plan_translation_file(file_path, existing_columns, language) for file_path in files]
+    # Every language of a table is merged in one pass, so its key ranges follow the rows of all of them.
+    merge_rows = {}
+    for step in steps:
+        if step['action'] == 'merge':
+            merge_rows[step['table']] = merge_rows.get(step['table'], 0) + step['rows']
+    for step in steps:
+        if step['action'] == 'merge':
+            step['partitions'] = planned_partitions(merge_rows[step['table']], options)
+
+    totals = {}
+    for step in steps:
+        language_totals = totals.setdefault(step['language'], {'files': 0, 'skipped': 0, 'rows': 0, 'bytes': 0})
+        language_totals['files'] += 1
+        if step['action'] == 'skip':
+            language_totals['skipped'] += 1
+        else:
+            language_totals['rows'] += step['rows']
+            language_totals['bytes'] += step['bytes']
+
+    estimated_seconds = 0.0
+    for language, language_totals in totals.items():
+        throughput = recorded_throughput(language, metrics_file)
+        language_totals['bytes_per_second'] = throughput
+        if throughput is None:
+            estimated_seconds = None
+        elif estimated_seconds is not None:
+            estimated_seconds += language_totals['bytes'] / throughput / max(options.get('workers', 1), 1)
+
+    return {
+        'version': PLAN_VERSION,
+        'created_at': time.time(),
+        'options': options,
+        'steps': steps,
+        'totals': totals,
+        'estimated_seconds': estimated_seconds,
+    }
+
+
+def save_plan(plan, plan_file):
+    with open(plan_file, 'w', encoding='utf-8') as handle:
+        json.dump(plan, handle, indent=2, ensure_ascii=False)
+
+
+def load_plan(plan_file):
+    with open(plan_file, encoding='utf-8') as handle:
+        plan = json.load(handle)
+    if plan.get('version') != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version: {plan.get('version')}")
+    return plan
+
+
+def print_plan(plan):
+    for step in plan['steps']:
+        details = f"{step['rows']} rows, {step['bytes']} bytes"
+        if step['language'] != PRIMARY_LANGUAGE:
+            details += f", new columns: {step['columns_to_add'] or 'none'}"
+            if step.get('partitions', 1) > 1:
+                details += f", {step['partitions']} key ranges"
+        print(f"[{step['language']}] {step['action']:<7} {step['table']} ({details})")
+    for language, language_totals in plan['totals'].items():
+        print(f"{language}: {language_totals}")
+    estimate = plan['estimated_seconds']
+    print(f"Estimated runtime: {f'{estimate:.1f} seconds' if estimate is not None else 'unknown (no recorded runs)'}")
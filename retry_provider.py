@@ -0,0 +1,59 @@
+import itertools
+import random
+import time
+
+import psycopg2
+from psycopg2 import errorcodes
+from psycopg2.extensions import TransactionRollbackError
+
+DEFAULT_RETRIES = 3
+# Seconds before the first retry; every further retry waits twice as long, up to MAX_RETRY_DELAY.
+DEFAULT_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+# Server errors worth retrying besides class 08 (connection exceptions) and class 40 (serialization failure,
+# deadlock): the server restarting or running out of connection slots.
+TRANSIENT_SQLSTATES = {
+    errorcodes.ADMIN_SHUTDOWN,
+    errorcodes.CRASH_SHUTDOWN,
+    errorcodes.CANNOT_CONNECT_NOW,
+    errorcodes.TOO_MANY_CONNECTIONS,
+}
+
+
+def is_transient_error(error):
+    """True for errors that a retry on a fresh connection can get past: dropped or reset connections,
+    serialization failures, deadlocks and server restarts. Data and SQL errors are not transient."""
+    if isinstance(error, TransactionRollbackError):
+        return True
+    pgcode = getattr(error, 'pgcode', None)
+    if pgcode:
+        return pgcode in TRANSIENT_SQLSTATES or pgcode.startswith('08')
+    # Without an SQLSTATE the server never answered: the connection was reset or closed under us.
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_RETRY_DELAY, max_delay=MAX_RETRY_DELAY):
+    """Exponential backoff with jitter, so workers that failed together don't retry together."""
+    delay = min(max_delay, base_delay * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_transient(work, retries=DEFAULT_RETRIES, base_delay=DEFAULT_RETRY_DELAY, on_retry=None,
+                    sleep=time.sleep):
+    """Call work() until it succeeds, retrying transient database errors up to retries times.
+
+    on_retry(error) is called before each retry, e.g. to swap in a fresh connection; work must be safe to
+    replay, which means it must not have committed anything it would apply twice.
+    """
+    for attempt in itertools.count():
+        try:
+            return work()
+        except psycopg2.Error as error:
+            if attempt >= retries or not is_transient_error(error):
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            print(f"Transient database error ({type(error).__name__}: {str(error).strip()}), "
+                  f"retry {attempt + 1}/{retries} in {delay:.2f}s")
+            if on_retry:
+                on_retry(error)
+            sleep(delay)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+import pandas as pd
+
+ROW_HASH_COLUMN = "_row_hash"
+FILE_HASH_TABLE = "_file_hashes"
+
+
+def normalize_cells(df):
+    """Render every cell as text the same way for every run, so int/str/NaN differences don't change the hash."""
+    return df.astype(object).where(df.notna(), '').astype(str)
+
+
+def compute_row_hashes(df):
+    """Hash every row of the DataFrame in one vectorized pass and return them as 16 character hex strings."""
+    hashes = pd.util.hash_pandas_object(normalize_cells(df), index=False)
+    return hashes.map('{:016x}'.format)
+
+
+def compute_rollup_hash(df, row_hashes):
+    """Combine the column names and all row hashes into a single hash for the whole file."""
+    rollup = hashlib.blake2b(digest_size=16)
+    rollup.update('\x1f'.join(str(col) for col in df.columns).encode('utf-8'))
+    for row_hash in sorted(row_hashes):
+        rollup.update(row_hash.encode('ascii'))
+    return rollup.hexdigest()
+
+
+def ensure_file_hash_table(cursor):
+    """Create or upgrade the metadata table; only runs DDL when something is missing, so concurrent loaders
+    don't queue behind each other's locks."""
+    cursor.execute("""
+        SELECT count(*) FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE table_name = %s AND column_name IN ('source_size', 'source_mtime', 'comment_rows')
+    """, (FILE_HASH_TABLE,))
+    if cursor.fetchone()[0] == 3:
+        return
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {FILE_HASH_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER,
+            rollup_hash TEXT,
+            updated_at TIMESTAMPTZ DEFAULT now()
+        )
+    """)
+    cursor.execute(f"ALTER TABLE {FILE_HASH_TABLE} ADD COLUMN IF NOT EXISTS source_size BIGINT")
+    cursor.execute(f"ALTER TABLE {FILE_HASH_TABLE} ADD COLUMN IF NOT EXISTS source_mtime DOUBLE PRECISION")
+    cursor.execute(f"ALTER TABLE {FILE_HASH_TABLE} ADD COLUMN IF NOT EXISTS comment_rows INTEGER")
+
+
+def fetch_file_hash(cursor, table_name):
+    """Return the rollup hash recorded for the table on the last run, or None."""
+    cursor.execute(f"SELECT rollup_hash FROM {FILE_HASH_TABLE} WHERE table_name = %s", (table_name.lower(),))
+    record = cursor.fetchone()
+    return record[0] if record else None
+
+
+def record_file_hash(cursor, table_name, rollup_hash, row_count):
+    cursor.execute(f"""
+        INSERT INTO {FILE_HASH_TABLE} (table_name, row_count, rollup_hash, updated_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (table_name) DO UPDATE
+        SET row_count = EXCLUDED.row_count, rollup_hash = EXCLUDED.rollup_hash, updated_at = now()
+    """, (table_name.lower(), row_count, rollup_hash))
+
+
+def record_file_signature(cursor, table_name, file_path, row_count, rollup_hash=None, keep_rollup_hash=False,
+                          comment_rows=0):
+    """Remember the size and modification time of the file a table was loaded from, with the rollup hash of
+    its rows and the number of comment rows the loader skipped.
+
+    keep_rollup_hash keeps the hash already recorded, which the delta sync writes itself. Loads that store no
+    _row_hash column (passthrough) record no rollup hash.
+    """
+    stat = os.stat(file_path)
+    cursor.execute(f"""
+        INSERT INTO {FILE_HASH_TABLE} AS f
+            (table_name, row_count, rollup_hash, source_size, source_mtime, comment_rows, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, now())
+        ON CONFLICT (table_name) DO UPDATE
+        SET row_count = EXCLUDED.row_count, source_size = EXCLUDED.source_size,
+            source_mtime = EXCLUDED.source_mtime, comment_rows = EXCLUDED.comment_rows, updated_at = now(),
+            rollup_hash = CASE WHEN %s THEN f.rollup_hash ELSE EXCLUDED.rollup_hash END
+    """, (table_name.lower(), row_count, rollup_hash, stat.st_size, stat.st_mtime, comment_rows, keep_rollup_hash))
+
+
+def fetch_file_signatures(cursor):
+    """Return {table_name: (source_size, source_mtime)} for every table loaded from a file."""
+    cursor.execute("SELECT to_regclass(%s)", (FILE_HASH_TABLE,))
+    if cursor.fetchone()[0] is None:
+        return {}
+    cursor.execute(f"SELECT table_name, source_size, source_mtime FROM {FILE_HASH_TABLE}")
+    return {table_name: (size, mtime) for table_name, size, mtime in cursor.fetchall()}
@@ -1,9 +1,14 @@
+import io
 import re
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 import pandas as pd
 import numpy as np
 
-from jptranslations_provider import is_japanese
+from language_provider import get_language
+from row_hash_provider import ROW_HASH_COLUMN, compute_row_hashes, compute_rollup_hash, ensure_file_hash_table, \
+    fetch_file_hash, record_file_hash
+from batch_size_provider import fixed_batches
 
 # CSV data types to PostgreSQL data types
 # TYPE_MAP = {
@@ -19,6 +24,45 @@ from jptranslations_provider import is_japanese
 # }
 
 
+# Type names the datamining CSVs put in the row under the column names, e.g. "int32,str,str".
+CSV_TYPE_PATTERN = re.compile(r'^(u?int(8|16|32|64)|s?byte|bool|str|single|float(32|64)?|double|datetime|bit&[0-9A-Fa-f]+)$')
+
+
+def is_metadata_marker(value):
+    """True for the first cell of a comment row ('#...') or of the type row ('int32')."""
+    return isinstance(value, str) and (value.startswith('#') or bool(CSV_TYPE_PATTERN.match(value)))
+
+
+def metadata_row_masks(df):
+    """Vectorized is_metadata_marker over the first column: (comment row mask, type row mask)."""
+    # Numbers and NaN turn into text that can't match either marker.
+    text = df[df.columns[0]].astype(str)
+    comment_mask = text.str.startswith('#')
+    return comment_mask, text.str.match(CSV_TYPE_PATTERN) & ~comment_mask
+
+
+def metadata_row_mask(df):
+    """True for the comment and type rows of a DataFrame."""
+    comment_mask, type_mask = metadata_row_masks(df)
+    return comment_mask | type_mask
+
+
+def split_metadata_rows(df):
+    """Separate a datamining DataFrame into (data rows, type row as a list or None, comment rows).
+
+    pandas has already taken the header row as the columns, so only real data rows are left in the first frame.
+    """
+    comment_mask, type_mask = metadata_row_masks(df)
+    type_rows = df[type_mask]
+    data_types = type_rows.iloc[0].tolist() if len(type_rows) else None
+    return df[~(comment_mask | type_mask)], data_types, df[comment_mask]
+
+
+def data_rows(df):
+    """The DataFrame without its comment and type rows."""
+    return df[~metadata_row_mask(df)]
+
+
 def sanitize_column_name(col_name):
     if col_name and col_name[0].isalnum():
         col_name = '_' + col_name
@@ -44,11 +88,15 @@ def map_data_type(csv_type):
     return 'TEXT'
 
 
-def create_table_from_df(df, table_name, conn):
-    cursor = conn.cursor()
+def create_table_from_df(df, table_name, conn, commit=True):
     print(f"Creating table: {table_name}")
-    data_types = df.iloc[2].tolist()
-    sanitized_columns = [sanitize_column_name(col) for col in df.columns]
+    _, data_types, _ = split_metadata_rows(df)
+    create_table_from_columns(list(df.columns), data_types or [None] * len(df.columns), table_name, conn, commit)
+
+
+def create_table_from_columns(columns, data_types, table_name, conn, commit=True):
+    cursor = conn.cursor()
+    sanitized_columns = [sanitize_column_name(col) for col in columns]
     print(f"Sanitized columns: {sanitized_columns}")
 
     column_definitions = []
@@ -68,12 +116,33 @@ def create_table_from_df(df, table_name, conn):
     cursor.execute(drop_table_query)
     print(f"Executing CREATE TABLE: {create_table_query.as_string(conn)}")
     cursor.execute(create_table_query)
-    conn.commit()
+    if commit:
+        conn.commit()
     cursor.close()
     print(f"Table {table_name} created successfully.")
 
 
-def insert_data_from_df(df, table_name, conn):
+def load_table_name(table_name):
+    """Table a full load fills before swap_in_table puts it in place of table_name."""
+    return f"{table_name}_load"
+
+
+def swap_in_table(conn, load_table, table_name):
+    """Replace the table with the one a full load filled, in the caller's transaction.
+
+    Until that commits readers keep seeing the old rows, and a load that fails part way leaves them untouched.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {table_name} CASCADE")
+    cursor.execute(f"ALTER TABLE {load_table} RENAME TO {table_name}")
+    cursor.close()
+    print(f"Swapped {load_table} in as {table_name}.")
+
+
+def insert_data_from_df(df, table_name, conn, batch_size=1000, transaction='file'):
+    """Insert the DataFrame one row at a time; with the 'batch' transaction policy every batch_size rows are
+    committed."""
+    df = data_rows(df)
     cursor = conn.cursor()
     sanitized_columns = [sanitize_column_name(col) for col in df.columns]
     print(f"Sanitized columns for insert: {sanitized_columns}")
@@ -86,187 +155,282 @@ def insert_data_from_df(df, table_name, conn):
     """)
     print(f"Insert query: {insert_query.as_string(conn)}")
 
-    for index, row in df.iterrows():
-        row_dict = {sanitize_column_name(col): row[col] for col in df.columns}
-        #  debugging
-        print(f"Inserting row {index}:")
-        for col, value in row_dict.items():
-            print(f"  Column '{col}': {value}")
-        cursor.execute(insert_query, row_dict)
-
-    conn.commit()
+    for start, stop in fixed_batches(len(df), batch_size):
+        for index, row in df.iloc[start:stop].iterrows():
+            row_dict = {sanitize_column_name(col): row[col] for col in df.columns}
+            #  debugging
+            print(f"Inserting row {index}:")
+            for col, value in row_dict.items():
+                print(f"  Column '{col}': {value}")
+            cursor.execute(insert_query, row_dict)
+        finish_batch(conn, transaction)
+
+    finish_file(conn, transaction)
     cursor.close()
     print(f"Data inserted into {table_name}.")
 
 
-def sanitize_column_name_for_db(col_name):
-    """Sanitize the column name for the database (remove first underscore) and quote numbers or invalid names."""
-    # Remove first underscore and quote columns like numbers or SQL reserved keywords
-    if col_name.startswith('_'):
-        col_name = col_name[1:]  # Remove the first underscore
-    # Quote column names if they are non-standard (like numbers or SQL reserved keywords)
-    return f'"{col_name}"' if col_name.isdigit() else col_name
-
-
-def sanitize_columns(df):
-    print(f"Sanitizing all columns in dataframe.")
-    sanitized = {col: sanitize_column_name_for_db(col) for col in df.columns}
-    print(f"Sanitized columns map: {sanitized}")
-    return sanitized
-
+def finish_batch(conn, transaction):
+    if transaction == 'batch':
+        conn.commit()
 
-def create_insert_query(df, table_name, sanitized_columns):
-    """Create an SQL insert statement using sanitized column names."""
-    columns_sql = ', '.join(sanitized_columns.values())
-    values_sql = ', '.join([f"%({col})s" for col in df.columns])
 
-    return sql.SQL(f"""
-        INSERT INTO {table_name} ({columns_sql}) 
-        VALUES ({values_sql})
-    """)
+def finish_file(conn, transaction):
+    if transaction in ('batch', 'file'):
+        conn.commit()
 
 
-from psycopg2 import sql
-
-
-def create_update_query(table_name, sanitized_columns, japanese_columns, df):
-    """Create an SQL update query for rows containing Japanese text."""
+def insert_data_from_df_batch(df, table_name, conn, batch_size=1000, transaction='file', batch_sizer=None):
+    """Insert the DataFrame with multi-row INSERT statements of batch_size rows, or of the sizes batch_sizer
+    (an AdaptiveBatchSize) picks."""
+    df = data_rows(df)
+    cursor = conn.cursor()
+    sanitized_columns = [sanitize_column_name(col) for col in df.columns]
+    insert_query = f"INSERT INTO {table_name} ({', '.join(sanitized_columns)}) VALUES %s"
+    print(f"Batch insert query: {insert_query} (batch size {batch_size})")
 
-    sanitized_columns_no_quotes = {key: value.replace('"', '') for key, value in sanitized_columns.items()}
-    sanitized_columns_no_quotes = {key: ('_' + value if value == 'key' else value)
-                                   for key, value in sanitized_columns_no_quotes.items()}
-    set_clause = ', '.join([f'"_{sanitized_columns_no_quotes[col]}_JP" = %({col})s' for col in japanese_columns])
-    where_column = df.columns[0]
-    where_clause = f'"{sanitized_columns_no_quotes[where_column]}" = %({where_column})s'
+    rows = list(df.itertuples(index=False, name=None))
+    batches = batch_sizer.batches(len(rows)) if batch_sizer else fixed_batches(len(rows), batch_size)
+    for start, stop in batches:
+        execute_values(cursor, insert_query, rows[start:stop], page_size=stop - start)
+        finish_batch(conn, transaction)
 
-    query_string = f"""
-        UPDATE {table_name} 
-        SET {set_clause}
-        WHERE {where_clause}
-    """
+    finish_file(conn, transaction)
+    cursor.close()
+    print(f"Data inserted into {table_name} in batches.")
 
-    # Print query for debugging
-    print(query_string)
 
-    update_query = sql.SQL(query_string)
+def copy_data_from_df(df, table_name, conn, batch_size=10000, transaction='file', batch_sizer=None):
+    """Stream the DataFrame into the table with COPY, batch_size rows (or as many as batch_sizer picks) per COPY
+    statement."""
+    df = data_rows(df)
+    cursor = conn.cursor()
+    sanitized_columns = [sanitize_column_name(col) for col in df.columns]
+    copy_query = f"COPY {table_name} ({', '.join(sanitized_columns)}) FROM STDIN WITH (FORMAT csv)"
+    print(f"Copy query: {copy_query} (batch size {batch_size})")
+
+    batches = batch_sizer.batches(len(df)) if batch_sizer else fixed_batches(len(df), batch_size)
+    for start, stop in batches:
+        buffer = io.StringIO()
+        # NaN is written the way the row and batch inserts store it, so every strategy loads the same values.
+        df.iloc[start:stop].to_csv(buffer, header=False, index=False, na_rep='NaN')
+        buffer.seek(0)
+        cursor.copy_expert(copy_query, buffer)
+        finish_batch(conn, transaction)
+
+    finish_file(conn, transaction)
+    cursor.close()
+    print(f"Data copied into {table_name}.")
 
-    return update_query
 
+def sanitize_column_name_for_db(col_name):
+    """Sanitize the column name for the database (remove first underscore) and quote numbers or invalid names."""
+    # Remove first underscore and quote columns like numbers or SQL reserved keywords
+    if col_name.startswith('_'):
+        col_name = col_name[1:]  # Remove the first underscore
+    # Quote column names if they are non-standard (like numbers or SQL reserved keywords)
+    return f'"{col_name}"' if col_name.isdigit() else col_name
 
-def check_japanese_columns(row, df):
-    """Check if any column contains Japanese text and print debug information."""
-    japanese_columns = []
-    for col in df.columns:
-        cell_content = row[col]
-        if is_japanese(cell_content):
-            print(f"(CSV) Detected Japanese text in column '{col}': {cell_content}")
-            japanese_columns.append(col)
-    return japanese_columns
 
+def insert_data_from_df_with_japanese(df, table_name, conn):
+    merge_translations_from_dfs({'jp': df}, table_name, conn)
+    print(f"Data with Japanese text handled for {table_name}.")
 
-def add_japanese_columns_if_needed(cursor, table_name, sanitized_columns, japanese_columns):
-    """Add Japanese columns to the table if they don't exist."""
-    print(f"cursor: {cursor}")
-    print(f"table name: {table_name}")
-    print(f"sanitized columns: {sanitized_columns}")
-    print(f"japanese columns: {japanese_columns}")
 
+def detected_translations(df, language):
+    """The cells of a secondary language file that are written in its script, as a DataFrame indexed by key
+    with one column per translated column, named like the table column they go to. Other cells are NaN."""
+    data = data_rows(df)
+    translated = {}
+    for col in df.columns[1:]:
+        detected = language.detect(data[col])
+        if detected.any():
+            translated[language.column_name(sanitize_column_name_for_db(col))] = data[col].where(detected)
+    frame = pd.DataFrame(translated, index=data.index)
+    frame.index = data[df.columns[0]].astype(str)
+    return frame.dropna(how='all')
+
+
+def staged_translations(dfs_by_language):
+    """(key column, DataFrame of the detected cells of every language indexed by key), see
+    detected_translations."""
+    key_column = None
+    frames = []
+    for language_name, df in dfs_by_language.items():
+        key_column = key_column or sanitize_column_name(df.columns[0])
+        frames.append(detected_translations(df, get_language(language_name)))
+    # Later rows with the same key win, like the row-by-row updates did.
+    staged = pd.concat(frames).groupby(level=0, sort=False).last() if frames else pd.DataFrame()
+    return key_column, staged
+
+
+def add_translation_columns(cursor, table_name, translated_columns):
+    """Add the missing translated columns to the table with a single ALTER TABLE."""
     table_name_lower = table_name.lower()
-
-    existing_columns_query = f"""
-    SELECT column_name
-    FROM INFORMATION_SCHEMA.COLUMNS
-    WHERE table_name = '{table_name_lower}'
-    """
-    cursor.execute(existing_columns_query)
-    existing_columns = cursor.fetchall()
-
+    cursor.execute("SELECT column_name FROM INFORMATION_SCHEMA.COLUMNS WHERE table_name = %s", (table_name_lower,))
+    existing_columns = {row[0] for row in cursor.fetchall()}
     if not existing_columns:
         raise ValueError(f"Error: Table '{table_name}' has no existing columns or does not exist.")
 
-    print(f"\nExisting columns in {table_name} before modification:")
-    for column in existing_columns:
-        print(f"  - {column[0]}")
-
-    # Loop through each Japanese column
-    for col in japanese_columns:
-        column_name = sanitized_columns[col]
-        column_name = column_name.replace('"', '')  # Clean up the column name
-        column_name_jp = f"_{column_name}_JP"  # Japanese dupe for column name
-
-        print(f"\nChecking if '{column_name_jp}' exists in {table_name}...")
-
-        # Check if the Japanese column already exists in the table
-        check_column_query = f"""
-        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS 
-        WHERE table_name = '{table_name_lower}' AND column_name = '{column_name_jp}'
-        """
-        cursor.execute(check_column_query)
-        column_exists = cursor.fetchone()
+    missing_columns = [col for col in translated_columns if col not in existing_columns]
+    if missing_columns:
+        add_columns = ', '.join(f'ADD COLUMN IF NOT EXISTS "{col}" TEXT' for col in missing_columns)
+        print(f"Adding columns to {table_name}: {missing_columns}")
+        cursor.execute(f'ALTER TABLE "{table_name_lower}" {add_columns}')
+
+
+def stage_translation_rows(cursor, stage_table, key_column, staged, temporary=True):
+    """Create the staging table and fill it with the staged cells."""
+    stage_columns = ', '.join(f'"{col}" TEXT' for col in staged.columns)
+    kind = 'TEMP' if temporary else 'UNLOGGED'
+    cursor.execute(f'CREATE {kind} TABLE {stage_table} ("{key_column}" TEXT, {stage_columns})')
+    rows = staged.astype(object).where(staged.notna(), None).itertuples(name=None)
+    execute_values(cursor, f"INSERT INTO {stage_table} VALUES %s", list(rows), page_size=10000)
+
+
+def translation_update_query(table_name, stage_table, key_column, translated_columns, key_range=''):
+    """UPDATE ... FROM the staging table; key_range is an extra condition on t.<key column>."""
+    set_clause = ', '.join(f'"{col}" = COALESCE(s."{col}", t."{col}")' for col in translated_columns)
+    return f"""
+        UPDATE "{table_name.lower()}" t SET {set_clause}
+        FROM {stage_table} s
+        WHERE t."{key_column}" = s."{key_column}"{key_range}
+    """
 
-        if not column_exists:
-            # ALTER TABLE statement to add the Japanese column
-            alter_table_query = f"""
-            ALTER TABLE "{table_name_lower}"
-            ADD COLUMN "{column_name_jp}" TEXT
-            """
-            print(f"\n  sql: {alter_table_query}")
 
-            cursor.execute(alter_table_query)
-        else:
-            print(f"Column '{column_name_jp}' already exists in table '{table_name}'")
+def merge_translations_from_dfs(dfs_by_language, table_name, conn, commit=True):
+    """Merge the files of every secondary language of a table into it in one pass.
 
-    cursor.execute(existing_columns_query)
-    updated_columns = cursor.fetchall()
+    Every column with text in a language's script gets a <column><suffix> column, all added with one ALTER
+    TABLE. The detected cells of all languages are staged in a temporary table and applied with a single
+    UPDATE ... FROM; cells without the language's script keep the value already in the table. Returns the
+    number of rows updated.
+    """
+    key_column, staged = staged_translations(dfs_by_language)
+    if staged.empty:
+        print(f"No translated text found for {table_name}.")
+        return 0
 
-    print(f"\nExisting columns in {table_name} after modification:")
-    for column in updated_columns:
-        print(f"  - {column[0]}")
+    translated_columns = list(staged.columns)
+    cursor = conn.cursor()
+    add_translation_columns(cursor, table_name, translated_columns)
+    stage_table = f"{table_name.lower()}_translations"
+    stage_translation_rows(cursor, stage_table, key_column, staged)
+    cursor.execute(translation_update_query(table_name, stage_table, key_column, translated_columns))
+    updated = cursor.rowcount
+    cursor.execute(f"DROP TABLE {stage_table}")
+    if commit:
+        conn.commit()
+    cursor.close()
+    print(f"Merged {', '.join(dfs_by_language)} text into {updated} rows of {table_name}.")
+    return updated
 
 
-def insert_or_update_row(cursor, row, df, table_name, sanitized_columns, insert_query):
-    """Insert or update a single row depending on whether Japanese text is found."""
-    japanese_columns = check_japanese_columns(row, df)
-    row_dict = {sanitize_column_name(col): row[col] for col in df.columns}
-    row_dict_unsanitized = {col: row[col] for col in df.columns}
+def ensure_primary_key(cursor, table_name, key_column):
+    """Add a primary key on the key column if the table does not have one yet."""
+    table_name_lower = table_name.lower()
+    primary_key_query = f"""
+    SELECT 1 FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS
+    WHERE table_name = '{table_name_lower}' AND constraint_type = 'PRIMARY KEY'
+    """
+    cursor.execute(primary_key_query)
+    if cursor.fetchone() is None:
+        alter_table_query = f"ALTER TABLE {table_name} ADD PRIMARY KEY ({key_column})"
+        print(f"Executing: {alter_table_query}")
+        cursor.execute(alter_table_query)
 
-    row_index = row.name
-    found_japanese_text = []
 
-    if japanese_columns:
-        for col in japanese_columns:
-            sanitized_col = sanitize_column_name(col)
-            row_dict[f"{sanitized_col}_JP"] = row[col]
-            japanese_text = row[col]
-            found_japanese_text.append((col, row_index, japanese_text))
+def sync_table_from_df(df, table_name, conn, transaction='file'):
+    """Apply only the inserted, changed and deleted rows of df to an existing table.
 
-        for col, index, text in found_japanese_text:
-            print(f"Found Japanese text in: \n     column '{col}'\n    row '{index}'\n    text: '{text}'")
+    The key column gets a primary key, the new file is staged in a temporary table and rows are compared
+    through the stored _row_hash column, so Japanese columns added by the merge stage are left untouched.
+    When the file's rollup hash matches the last run and the table still exists, it is not touched at all. The
+    changes are committed unless the transaction policy is 'run'.
+    """
+    df = data_rows(df)
+    cursor = conn.cursor()
+    sanitized_columns = [sanitize_column_name(col) for col in df.columns]
+    key_column = sanitized_columns[0]
+    stage_table = f"{table_name}_stage"
+    print(f"Syncing table: {table_name}")
+
+    row_hashes = compute_row_hashes(df)
+    rollup_hash = compute_rollup_hash(df, row_hashes)
+    ensure_file_hash_table(cursor)
+    cursor.execute("SELECT to_regclass(%s)", (table_name.lower(),))
+    table_exists = cursor.fetchone()[0] is not None
+    if table_exists and fetch_file_hash(cursor, table_name) == rollup_hash:
+        finish_file(conn, transaction)
+        cursor.close()
+        print(f"Table {table_name} is up to date (rollup hash {rollup_hash}).")
+        return {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    column_definitions = ', '.join(f"{column} {map_data_type(None)}" for column in sanitized_columns)
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({column_definitions}, PRIMARY KEY ({key_column}))")
+    ensure_primary_key(cursor, table_name, key_column)
+    for column in sanitized_columns + [ROW_HASH_COLUMN]:
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column} {map_data_type(None)}")
+
+    staged_columns = sanitized_columns + [ROW_HASH_COLUMN]
+    columns_sql = ', '.join(staged_columns)
+    cursor.execute(f"CREATE TEMP TABLE {stage_table} ({column_definitions}, {ROW_HASH_COLUMN} TEXT) ON COMMIT DROP")
+    staged_rows = [row + (row_hash,) for row, row_hash in zip(df.itertuples(index=False, name=None), row_hashes)]
+    execute_values(cursor, f"INSERT INTO {stage_table} ({columns_sql}) VALUES %s", staged_rows)
+
+    delete_query = f"""
+        DELETE FROM {table_name} t
+        WHERE NOT EXISTS (SELECT 1 FROM {stage_table} s WHERE s.{key_column} = t.{key_column})
+    """
+    cursor.execute(delete_query)
+    deleted = cursor.rowcount
+
+    update_set = ', '.join(f"{column} = EXCLUDED.{column}" for column in staged_columns[1:])
+    upsert_query = f"""
+        INSERT INTO {table_name} ({columns_sql})
+        SELECT {', '.join(f's.{column}' for column in staged_columns)}
+        FROM {stage_table} s
+        LEFT JOIN {table_name} t ON t.{key_column} = s.{key_column}
+        WHERE t.{key_column} IS NULL OR t.{ROW_HASH_COLUMN} IS DISTINCT FROM s.{ROW_HASH_COLUMN}
+        ON CONFLICT ({key_column}) DO UPDATE SET {update_set}
+        RETURNING (xmax = 0) AS inserted
+    """
+    cursor.execute(upsert_query)
+    upserted = [row[0] for row in cursor.fetchall()]
+    inserted = sum(1 for was_inserted in upserted if was_inserted)
+    changes = {'inserted': inserted, 'updated': len(upserted) - inserted, 'deleted': deleted}
+    record_file_hash(cursor, table_name, rollup_hash, len(df))
 
-        add_japanese_columns_if_needed(cursor, table_name, sanitized_columns, japanese_columns)
+    finish_file(conn, transaction)
+    cursor.close()
+    print(f"Table {table_name} synced: {changes}")
+    return changes
 
-        update_query = create_update_query(table_name, sanitized_columns, japanese_columns, df)
-        print("Row Dict:", row_dict_unsanitized)
-        cursor.execute(update_query, row_dict_unsanitized)
-        # cursor.execute(update_query)
-    else:
-        print(f"Skipping row without Japanese text (row index {row_index}): {row.to_dict()}")
 
+def detect_drift(df, table_name, conn):
+    """Compare the stored row hashes with the DataFrame and return the keys that were added, changed or removed.
 
-def insert_data_from_df_with_japanese(df, table_name, conn):
+    Raises ValueError for tables stored without a _row_hash column.
+    """
+    df = data_rows(df)
     cursor = conn.cursor()
-    sanitized_columns = sanitize_columns(df)
-    print(f"Sanitized columns for Japanese check: {sanitized_columns}")
-
-    insert_query = create_insert_query(df, table_name, sanitized_columns)
-    print(f"Insert query with Japanese columns: {insert_query.as_string(conn)}")
-
-    for _, row in df.iterrows():
-        if str(row[df.columns[0]]).startswith('#'):
-            print(f"Skipping row with # in first column: {row[df.columns[0]]}")
-            continue
-        insert_or_update_row(cursor, row, df, table_name, sanitized_columns, insert_query)
-
-    conn.commit()
+    key_column = sanitize_column_name(df.columns[0])
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS WHERE table_name = %s AND column_name = %s
+    """, (table_name.lower(), ROW_HASH_COLUMN))
+    if cursor.fetchone() is None:
+        cursor.close()
+        raise ValueError(f"Error: Table '{table_name}' has no {ROW_HASH_COLUMN} column; it was loaded without "
+                         f"row hashes (passthrough strategy). Reload it with another strategy first.")
+    cursor.execute(f"SELECT {key_column}, {ROW_HASH_COLUMN} FROM {table_name}")
+    stored = dict(cursor.fetchall())
     cursor.close()
-    print(f"Data with Japanese text handled for {table_name}.")
+
+    current = dict(zip(df[df.columns[0]].astype(str), compute_row_hashes(df)))
+    drift = {
+        'added': sorted(key for key in current if key not in stored),
+        'changed': sorted(key for key in current if key in stored and stored[key] != current[key]),
+        'removed': sorted(key for key in stored if key not in current),
+    }
+    print(f"Drift for {table_name}: { {kind: len(keys) for kind, keys in drift.items()} }")
+    return drift
@@ -0,0 +1,57 @@
+import itertools
+import weakref
+from collections import OrderedDict
+
+# Prepared statements live in the server session, so each connection keeps its own bounded set.
+DEFAULT_MAX_STATEMENTS = 256
+
+_caches = weakref.WeakKeyDictionary()
+
+
+class StatementCache:
+    """LRU cache of server-side prepared statements for one connection.
+
+    Statements are keyed by their shape, e.g. (table, column set), built once with PREPARE and run with EXECUTE,
+    so Postgres parses and plans each shape once. The least recently used statement is DEALLOCATEd when the
+    cache is full. PREPARE is not transactional, so a rollback does not invalidate the cache.
+    """
+
+    def __init__(self, max_statements=DEFAULT_MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self.statements = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._names = itertools.count()
+
+    def execute(self, cursor, key, build, params):
+        """Execute the statement cached under key with params, preparing it first from build() if needed.
+
+        build returns (query, param_types) where the query uses $1..$n placeholders.
+        """
+        name = self.statements.get(key)
+        if name is None:
+            self.misses += 1
+            query, param_types = build()
+            name = f"stmt_{next(self._names)}"
+            cursor.execute(f"PREPARE {name} ({', '.join(param_types)}) AS {query}")
+            self.statements[key] = name
+            if len(self.statements) > self.max_statements:
+                _, evicted = self.statements.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        else:
+            self.hits += 1
+            self.statements.move_to_end(key)
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+    def invalidate_table(self, cursor, table_name):
+        """Deallocate every statement whose key starts with the table name."""
+        for key in [key for key in self.statements if key[0] == table_name]:
+            cursor.execute(f"DEALLOCATE {self.statements.pop(key)}")
+
+
+def statement_cache_for(conn, max_statements=DEFAULT_MAX_STATEMENTS):
+    """Return the statement cache of a connection, creating it on first use."""
+    cache = _caches.get(conn)
+    if cache is None:
+        cache = _caches[conn] = StatementCache(max_statements)
+    return cache
@@ -0,0 +1,48 @@
+import unittest
+
+from batch_size_provider import AdaptiveBatchSize, fixed_batches
+
+
+class TestBatchSize(unittest.TestCase):
+
+    def test_fixed_batches_cover_every_row(self):
+        self.assertEqual(list(fixed_batches(5, 2)), [(0, 2), (2, 4), (4, 5)])
+
+    def test_grows_while_throughput_keeps_up(self):
+        sizer = AdaptiveBatchSize(100, minimum=10, maximum=300)
+        sizer.record(100, 0.01)
+        self.assertEqual(sizer.size, 200)
+        sizer.record(200, 0.02)
+        self.assertEqual(sizer.size, 300)
+
+    def test_returns_to_best_size_when_bigger_batches_are_slower(self):
+        sizer = AdaptiveBatchSize(100, minimum=10, maximum=1000)
+        sizer.record(100, 0.01)
+        sizer.record(200, 0.04)
+        self.assertEqual(sizer.size, 100)
+        sizer.record(100, 0.01)
+        self.assertEqual(sizer.size, 100)
+
+    def test_shrinks_slow_batches_within_bounds(self):
+        sizer = AdaptiveBatchSize(100, minimum=40, maximum=1000, target_latency=0.1)
+        sizer.record(100, 0.5)
+        self.assertEqual(sizer.size, 50)
+        sizer.record(50, 0.5)
+        self.assertEqual(sizer.size, 40)
+
+    def test_batches_cover_every_row_and_summarize_sizes(self):
+        sizer = AdaptiveBatchSize(2, minimum=2, maximum=4)
+        ranges = list(sizer.batches(9))
+        self.assertEqual(ranges[0], (0, 2))
+        self.assertEqual(ranges[-1][1], 9)
+        self.assertEqual(sum(stop - start for start, stop in ranges), 9)
+        self.assertEqual(sum(count for _, count in sizer.summary()['batch_sizes']), len(ranges))
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestBatchSize)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
@@ -0,0 +1,76 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from bilingual_provider import refresh_bilingual_lines, export_bilingual_lines, BILINGUAL_TABLE
+from database_provider import connect_to_db
+from test.pg_harness import PostgresTestCase
+
+
+class TestBilingual(PostgresTestCase):
+
+    def setUp(self):
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS ClsArc000_00021")
+        cursor.execute('CREATE TABLE ClsArc000_00021 (_key TEXT, _0 TEXT, _1 TEXT, "_1_JP" TEXT)')
+        cursor.execute("""
+            INSERT INTO ClsArc000_00021 VALUES
+                ('0', 'TEXT_A', 'Hello', 'こんにちは'),
+                ('1', 'TEXT_B', 'Bye', NULL),
+                ('2', 'TEXT_C', 'NaN', 'さようなら')
+        """)
+        cursor.execute(f"DROP TABLE IF EXISTS {BILINGUAL_TABLE}")
+        conn.commit()
+        conn.close()
+
+    def fetch_lines(self):
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT table_name, key, column_name, eng_text, jp_text FROM {BILINGUAL_TABLE} ORDER BY key")
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def test_refresh_unpivots_translated_cells(self):
+        conn = connect_to_db()
+        self.assertEqual(refresh_bilingual_lines(conn), 2)
+        conn.close()
+
+        self.assertEqual(self.fetch_lines(), [
+            ('clsarc000_00021', '0', '_1', 'Hello', 'こんにちは'),
+            ('clsarc000_00021', '2', '_1', None, 'さようなら'),
+        ])
+
+    def test_refresh_of_a_reloaded_table_drops_its_lines(self):
+        conn = connect_to_db()
+        refresh_bilingual_lines(conn)
+        cursor = conn.cursor()
+        cursor.execute('ALTER TABLE ClsArc000_00021 DROP COLUMN "_1_JP"')
+        conn.commit()
+        self.assertEqual(refresh_bilingual_lines(conn, ['ClsArc000_00021']), 0)
+        conn.close()
+
+        self.assertEqual(self.fetch_lines(), [])
+
+    def test_export_streams_jsonl(self):
+        conn = connect_to_db()
+        refresh_bilingual_lines(conn)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'lines.jsonl'
+            self.assertEqual(export_bilingual_lines(conn, path), 2)
+            lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        conn.close()
+
+        self.assertEqual(lines[0], {'table_name': 'clsarc000_00021', 'key': '0', 'column_name': '_1',
+                                    'eng_text': 'Hello', 'jp_text': 'こんにちは'})
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestBilingual)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
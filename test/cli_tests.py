@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Importing main should stay well under this many seconds; heavy modules belong inside the subcommands.
+IMPORT_TIME_BUDGET = 0.2
+HEAVY_MODULES = ('pandas', 'numpy', 'psycopg2')
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip()
+
+
+class TestCli(unittest.TestCase):
+
+    def test_import_does_not_load_heavy_modules(self):
+        loaded = run_python(f"import sys, main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+        self.assertEqual(loaded, '[]')
+
+    def test_import_time_budget(self):
+        elapsed = float(run_python("import time; start = time.perf_counter(); import main; "
+                                   "print(time.perf_counter() - start)"))
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET, f"Importing main took {elapsed:.3f}s")
+
+    def test_scan_lists_files_without_heavy_modules(self):
+        output = run_python(f"import sys, main; main.main(['--base-dir', {str(PROJECT_ROOT / 'rsrc' / 'csv')!r}, "
+                            f"'scan']); print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+        self.assertIn('eng:', output)
+        self.assertIn('jp:', output)
+        self.assertTrue(output.endswith('[]'))
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestCli)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
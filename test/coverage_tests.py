@@ -8,6 +8,20 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../'
 from test.lang_tests import TestLang
 from test.io_tests import TestIO  # Ensure this path is correct
 from test.db_tests import TestDatabase  # Ensure this path is correct
+from test.hash_tests import TestRowHash
+from test.cli_tests import TestCli
+from test.plan_tests import TestPlan
+from test.load_tests import TestLoad
+from test.statement_cache_tests import TestStatementCache
+from test.profiling_tests import TestProfiling
+from test.passthrough_tests import TestPassthrough
+from test.translation_coverage_tests import TestTranslationCoverage
+from test.bilingual_tests import TestBilingual
+from test.batch_size_tests import TestBatchSize
+from test.retry_tests import TestRetry
+from test.language_tests import TestLanguage
+from test.lookup_tests import TestLookupCache, TestLookup
+from test.partitioned_merge_tests import TestKeyRanges, TestPartitionedMerge
 
 class TestRunAllTests(unittest.TestCase):
 
@@ -26,3 +40,83 @@ class TestRunAllTests(unittest.TestCase):
         self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
         # Check the number of failures (if any)
         self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestRowHash.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestCli.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestPlan.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestLoad.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestStatementCache.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestProfiling.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestPassthrough.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestTranslationCoverage.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestBilingual.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestBatchSize.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestRetry.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestLanguage.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestLookupCache.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestLookup.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestKeyRanges.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
+
+        result = TestPartitionedMerge.run_all_tests()
+        self.assertTrue(result.wasSuccessful(), f"Some tests failed. Failures: {result.failures}")
+        # Check the number of failures (if any)
+        self.assertEqual(len(result.failures), 0, f"Test failures: {result.failures}")
@@ -6,7 +6,9 @@ from psycopg2.sql import SQL
 
 from database_provider import connect_to_db
 from jptranslations_provider import is_japanese
-from sql_provider import create_table_from_df, insert_data_from_df, insert_data_from_df_with_japanese
+from sql_provider import create_table_from_df, insert_data_from_df, insert_data_from_df_with_japanese, \
+    sync_table_from_df, split_metadata_rows
+from test.pg_harness import start_test_database
 
 import os
 import pandas as pd
@@ -138,6 +140,19 @@ def verify_and_compare_records(csv_file: str, expected_num_records: int, connect
 
 class TestDatabase(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # The mocked tests don't need a server, so they still run when no throwaway database can be started.
+        try:
+            cls.database_server = start_test_database()
+        except unittest.SkipTest:
+            cls.database_server = None
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.database_server:
+            cls.database_server.stop()
+
     def test_real_connection_to_db_integration(self):
         connection = connect_to_db()
         try:
@@ -271,6 +286,50 @@ class TestDatabase(unittest.TestCase):
         cursor = connection.cursor()
 
 
+    def test_split_metadata_rows_keeps_only_data_rows(self):
+        csvdf = pd.DataFrame({'key': ['#', 'int32', '0', '1', '#note'], '0': [np.nan, 'str', 'a', 'b', np.nan],
+                              '1': [np.nan, 'str', 'x', '#y', np.nan]})
+        data, data_types, comments = split_metadata_rows(csvdf)
+
+        self.assertEqual(data['key'].tolist(), ['0', '1'])
+        self.assertEqual(data_types, ['int32', 'str', 'str'])
+        self.assertEqual(comments['key'].tolist(), ['#', '#note'])
+
+    def test_insert_data_from_df_skips_metadata_rows(self):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+
+        csvdf = pd.DataFrame({'key': ['#', 'int32', '0'], '0': [np.nan, 'str', 'a'], '1': [np.nan, 'str', 'x']})
+        insert_data_from_df(csvdf, 'ClsArc000_00021', mock_connection)
+
+        inserted = [call.args[1] for call in mock_cursor.execute.call_args_list]
+        self.assertEqual(inserted, [{'_key': '0', '_0': 'a', '_1': 'x'}])
+
+    def test_sync_table_from_df_applies_only_changes(self):
+        mock_connection = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1,)
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchall.return_value = [(True,), (False,), (False,)]
+
+        csvdf = pd.DataFrame({'key': ['0', '1', '2'], '0': ['a', 'b', 'c'], '1': ['x', 'y', 'z']})
+        with patch('sql_provider.execute_values') as mock_execute_values:
+            changes = sync_table_from_df(csvdf, 'ClsArc000_00021', mock_connection)
+
+        staged_rows = mock_execute_values.call_args.args[2]
+        self.assertEqual([row[:3] for row in staged_rows], [('0', 'a', 'x'), ('1', 'b', 'y'), ('2', 'c', 'z')])
+        self.assertTrue(all(len(row[3]) == 16 for row in staged_rows))
+
+        self.assertEqual(changes, {'inserted': 1, 'updated': 2, 'deleted': 1})
+        executed = [str(call.args[0]) for call in mock_cursor.execute.call_args_list]
+        self.assertFalse(any('DROP TABLE' in query for query in executed))
+        self.assertTrue(any('ON CONFLICT (_key) DO UPDATE SET _0 = EXCLUDED._0, _1 = EXCLUDED._1, _row_hash = EXCLUDED._row_hash'
+                            in query
+                            for query in executed))
+        mock_connection.commit.assert_called_once()
+
     @staticmethod
     def run_all_tests():
         test_loader = unittest.TestLoader()
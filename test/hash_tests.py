@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from row_hash_provider import compute_row_hashes, compute_rollup_hash
+
+
+class TestRowHash(unittest.TestCase):
+
+    def test_hash_is_stable_across_value_types(self):
+        as_strings = pd.DataFrame({'key': ['0', '1'], '0': ['a', np.nan]})
+        as_ints = pd.DataFrame({'key': [0, 1], '0': ['a', None]})
+        self.assertEqual(compute_row_hashes(as_strings).tolist(), compute_row_hashes(as_ints).tolist())
+
+    def test_changed_cell_changes_only_its_row(self):
+        df = pd.DataFrame({'key': ['0', '1', '2'], '0': ['a', 'b', 'c']})
+        changed = df.copy()
+        changed.loc[1, '0'] = 'B'
+        before, after = compute_row_hashes(df), compute_row_hashes(changed)
+        self.assertEqual((before != after).tolist(), [False, True, False])
+
+    def test_rollup_ignores_row_order_but_not_columns(self):
+        df = pd.DataFrame({'key': ['0', '1'], '0': ['a', 'b']})
+        reordered = df.iloc[::-1]
+        self.assertEqual(compute_rollup_hash(df, compute_row_hashes(df)),
+                         compute_rollup_hash(reordered, compute_row_hashes(reordered)))
+        renamed = df.rename(columns={'0': '1'})
+        self.assertNotEqual(compute_rollup_hash(df, compute_row_hashes(df)),
+                            compute_rollup_hash(renamed, compute_row_hashes(renamed)))
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestRowHash)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
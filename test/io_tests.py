@@ -1,22 +1,18 @@
+import tempfile
 import unittest
 from pathlib import Path
 
-from csv_structure_provider import list_csv_files_in_directory, list_quest_files_for_language, Config
+from csv_structure_provider import list_csv_files_in_directory, list_quest_files_for_language, Config, \
+    list_files_for_language, matches_globs
 
 
 class TestIO(unittest.TestCase):
 
     def test_files_exist(self):
-        file_path = Path(r'C:\Users\sbelknap\PycharmProjects\dialogdbconn\rsrc\csv')
-        self.assertTrue(file_path.exists(), f"File {file_path} does not exist")
-
         project_root = Path(__file__).resolve().parent.parent  # Adjust if necessary for deeper nested directories
         file_path = project_root / 'rsrc' / 'csv'   # Relative to the project root
         self.assertTrue(file_path.exists(), f"File {file_path} does not exist")
 
-        file_path = Path(r'C:\Users\sbelknap\PycharmProjects\dialogdbconn\rsrc\csv')
-        self.assertTrue(file_path.exists(), f"File {file_path} does not exist")
-
         project_root = Path(__file__).resolve().parent.parent  # Adjust if necessary for deeper nested directories
         file_path = project_root / 'rsrc' / 'csv' / 'eng' / 'cut_scene'  # Relative to the project root
         self.assertTrue(file_path.exists(), f"File {file_path} does not exist")
@@ -77,6 +73,29 @@ class TestIO(unittest.TestCase):
         self.assertNotIn(un_expected_file, list_quest_files_for_language('eng', str(base_dir)))
         self.assertNotIn(un_expected_file, list_quest_files_for_language('jp', str(base_dir)))
 
+    def test_list_files_for_language_filters_categories_and_globs(self):
+        with tempfile.TemporaryDirectory() as base_dir:
+            for relative_path in ('eng/quest/000/ClsArc000_00021.csv', 'eng/quest/000/GaiUsd501_00043.csv',
+                                  'eng/cut_scene/022/VoiceMan_02200.csv', 'eng/BGM.csv'):
+                path = Path(base_dir) / relative_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text('key,0,1\n')
+
+            all_files = [Path(file).name for file in list_files_for_language('eng', base_dir)]
+            self.assertEqual(sorted(all_files), ['ClsArc000_00021.csv', 'GaiUsd501_00043.csv', 'VoiceMan_02200.csv'])
+
+            cut_scenes = list_files_for_language('eng', base_dir, categories=[Config.CUTSCENE_DIR])
+            self.assertEqual([Path(file).name for file in cut_scenes], ['VoiceMan_02200.csv'])
+
+            filtered = list_files_for_language('eng', base_dir, include=['quest/*'], exclude=['Gai*'])
+            self.assertEqual([Path(file).name for file in filtered], ['ClsArc000_00021.csv'])
+
+    def test_matches_globs(self):
+        self.assertTrue(matches_globs('quest/000/ClsArc000_00021.csv'))
+        self.assertTrue(matches_globs('quest/000/ClsArc000_00021.csv', include=['ClsArc*']))
+        self.assertFalse(matches_globs('quest/000/ClsArc000_00021.csv', include=['cut_scene/*']))
+        self.assertFalse(matches_globs('quest/000/ClsArc000_00021.csv', exclude=['quest/000/*']))
+
     @staticmethod
     def run_all_tests():
         # Load all the test cases from the TestDatabase class
@@ -0,0 +1,48 @@
+import unittest
+
+import pandas as pd
+
+from language_provider import get_language, secondary_languages, PRIMARY_LANGUAGE
+from sql_provider import detected_translations, metadata_row_mask
+
+
+class TestLanguage(unittest.TestCase):
+
+    def test_registry(self):
+        self.assertEqual(PRIMARY_LANGUAGE, 'eng')
+        self.assertTrue(get_language('ENG').is_primary)
+        self.assertEqual([language.name for language in secondary_languages()], ['jp', 'de', 'fr', 'chs', 'ko'])
+        self.assertEqual([language.name for language in secondary_languages(['eng', 'ko'])], ['ko'])
+        with self.assertRaises(ValueError):
+            get_language('xx')
+
+    def test_column_names(self):
+        self.assertEqual(get_language('jp').column_name('"1"'), '_1_JP')
+        self.assertEqual(get_language('fr').column_name('speaker'), '_speaker_FR')
+
+    def test_vectorized_detectors(self):
+        cells = pd.Series(['TEXT_A', 'こんにちは', None, 12, 'Über den Wolken', '안녕하세요', '（★未使用／削除予定★）'])
+        self.assertEqual(get_language('jp').detect(cells).tolist(),
+                         [False, True, False, False, False, False, False])
+        self.assertEqual(get_language('de').detect(cells).tolist(),
+                         [False, False, False, False, True, False, False])
+        self.assertEqual(get_language('ko').detect(cells).tolist(),
+                         [False, False, False, False, False, True, False])
+
+    def test_detected_translations_skip_metadata_rows(self):
+        df = pd.DataFrame({'key': ['#', 'int32', '0', '1'], '0': [None, 'str', 'TEXT_A', 'TEXT_B'],
+                           '1': [None, 'str', 'Bonjour', None]})
+        self.assertEqual(metadata_row_mask(df).tolist(), [True, True, False, False])
+
+        translations = detected_translations(df, get_language('fr'))
+        self.assertEqual(list(translations.columns), ['_1_FR'])
+        self.assertEqual(translations.to_dict('index'), {'0': {'_1_FR': 'Bonjour'}})
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestLanguage)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
@@ -0,0 +1,238 @@
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import psycopg2
+
+import database_provider
+from batch_size_provider import AdaptiveBatchSize
+from database_provider import connect_to_db
+from main import process_files, process_translations, load_eng_file
+from sql_provider import create_table_from_df, insert_data_from_df_batch, copy_data_from_df, sync_table_from_df, \
+    detect_drift
+from row_hash_provider import compute_row_hashes, compute_rollup_hash, fetch_file_hash
+from passthrough_provider import copy_file_passthrough
+from test.pg_harness import PostgresTestCase
+
+ENG_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,"Hello,\nthere"\n1,TEXT_B,\n2,TEXT_C,Bye\n'
+JP_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,こんにちは\n1,TEXT_B,\n2,TEXT_C,さようなら\n'
+DE_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,Guten Tag\n1,TEXT_B,\n2,TEXT_C,Auf Wiedersehen\n'
+
+
+def fetch_rows(table_name, columns='_key, _0, _1'):
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {columns} FROM {table_name} ORDER BY _key")
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+class TestLoad(PostgresTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.temp_dir.name)
+        self.eng_file = self.base_dir / 'eng' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        self.jp_file = self.base_dir / 'jp' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        for path, content in ((self.eng_file, ENG_CSV), (self.jp_file, JP_CSV)):
+            path.parent.mkdir(parents=True)
+            path.write_text(content, encoding='utf-8')
+        self.df = pd.read_csv(self.eng_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def load_with(self, loader, **kwargs):
+        conn = connect_to_db()
+        create_table_from_df(self.df, 'ClsArc000_00021', conn)
+        loader(self.df, 'ClsArc000_00021', conn, **kwargs)
+        conn.close()
+        return fetch_rows('ClsArc000_00021')
+
+    def test_batch_and_copy_load_the_same_rows(self):
+        batch_rows = self.load_with(insert_data_from_df_batch, batch_size=2)
+        copy_rows = self.load_with(copy_data_from_df, batch_size=2)
+        self.assertEqual(batch_rows, copy_rows)
+        self.assertEqual(copy_rows, [('0', 'TEXT_A', 'Hello,\nthere'), ('1', 'TEXT_B', 'NaN'), ('2', 'TEXT_C', 'Bye')])
+
+    def test_adaptive_batches_load_the_same_rows(self):
+        fixed_rows = self.load_with(copy_data_from_df, batch_size=2)
+        adaptive_rows = self.load_with(insert_data_from_df_batch,
+                                       batch_sizer=AdaptiveBatchSize(1, minimum=1, maximum=2))
+        self.assertEqual(fixed_rows, adaptive_rows)
+
+    def test_passthrough_copies_only_data_rows(self):
+        conn = connect_to_db()
+        rows, comment_rows = copy_file_passthrough(str(self.eng_file), 'ClsArc000_00021', conn)
+        conn.close()
+
+        self.assertEqual((rows, comment_rows), (3, 1))
+        self.assertEqual(fetch_rows('ClsArc000_00021'),
+                         [('0', 'TEXT_A', 'Hello,\nthere'), ('1', 'TEXT_B', None), ('2', 'TEXT_C', 'Bye')])
+
+    def test_sync_applies_changes(self):
+        conn = connect_to_db()
+        sync_table_from_df(self.df, 'ClsArc000_00021', conn)
+        changed = self.df.copy()
+        changed.loc[changed['key'] == '2', '1'] = 'Farewell'
+        changed = changed[changed['key'] != '1']
+        changes = sync_table_from_df(changed, 'ClsArc000_00021', conn)
+        conn.close()
+
+        self.assertEqual(changes, {'inserted': 0, 'updated': 1, 'deleted': 1})
+        self.assertIn(('2', 'TEXT_C', 'Farewell'), fetch_rows('ClsArc000_00021'))
+
+    def test_parallel_load_and_jp_merge(self):
+        options = argparse.Namespace(workers=2, batch_size=2, strategy='copy', transaction='run', delta=False)
+        process_files([str(self.eng_file)], 'eng', options)
+        process_files([str(self.jp_file)], 'jp', options)
+
+        rows = fetch_rows('ClsArc000_00021', columns='_key, "_1_JP"')
+        self.assertIn(('0', 'こんにちは'), rows)
+        self.assertIn(('2', 'さようなら'), rows)
+
+    def test_transient_failure_is_replayed_on_a_fresh_connection(self):
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='copy', transaction='file', delta=False,
+                                     retries=2, retry_delay=0)
+        used_connections = []
+
+        def flaky_load(conn, file_path, options):
+            used_connections.append(conn)
+            if len(used_connections) == 1:
+                create_table_from_df(self.df, 'ClsArc000_00021', conn, commit=False)
+                raise psycopg2.OperationalError("server closed the connection unexpectedly")
+            return load_eng_file(conn, file_path, options)
+
+        with mock.patch('main.load_eng_file', flaky_load):
+            process_files([str(self.eng_file)], 'eng', options)
+
+        self.assertEqual(len(used_connections), 2)
+        self.assertIsNot(used_connections[0], used_connections[1])
+        self.assertEqual(len(fetch_rows('ClsArc000_00021')), 3)
+
+    def test_failed_connect_is_retried(self):
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='copy', transaction='file', delta=False,
+                                     retries=2, retry_delay=0)
+        create_connection_pool = database_provider.create_connection_pool
+
+        class FlakyPool:
+            """Pool whose first worker connect fails the way it does while the server restarts."""
+
+            def __init__(self, max_connections, min_connections=1):
+                self.pool = create_connection_pool(max_connections, min_connections)
+                self.connects = 0
+
+            def getconn(self):
+                self.connects += 1
+                if self.connects == 2:
+                    raise psycopg2.OperationalError("the database system is starting up")
+                return self.pool.getconn()
+
+            def __getattr__(self, name):
+                return getattr(self.pool, name)
+
+        with mock.patch('database_provider.create_connection_pool', FlakyPool):
+            process_files([str(self.eng_file)], 'eng', options)
+
+        self.assertEqual(len(fetch_rows('ClsArc000_00021')), 3)
+
+    def test_failed_load_keeps_the_loaded_table(self):
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='copy', transaction='file', delta=False,
+                                     retries=1, retry_delay=0)
+        process_files([str(self.eng_file)], 'eng', options)
+
+        error = psycopg2.OperationalError("server closed the connection unexpectedly")
+        with mock.patch('sql_provider.copy_data_from_df', side_effect=error):
+            with self.assertRaises(psycopg2.OperationalError):
+                process_files([str(self.eng_file)], 'eng', options)
+
+        self.assertEqual(len(fetch_rows('ClsArc000_00021')), 3)
+
+    def test_secondary_languages_are_merged_in_one_pass(self):
+        de_file = self.base_dir / 'de' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        de_file.parent.mkdir(parents=True)
+        de_file.write_text(DE_CSV, encoding='utf-8')
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='copy', transaction='file', delta=False)
+        process_files([str(self.eng_file)], 'eng', options)
+        process_translations({'jp': [str(self.jp_file)], 'de': [str(de_file)]}, options)
+
+        rows = fetch_rows('ClsArc000_00021', columns='_key, "_1_JP", "_1_DE"')
+        self.assertIn(('0', 'こんにちは', 'Guten Tag'), rows)
+        self.assertIn(('1', None, None), rows)
+        self.assertIn(('2', 'さようなら', 'Auf Wiedersehen'), rows)
+
+    def test_merge_refreshes_bilingual_lines(self):
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='copy', transaction='file', delta=False,
+                                     refresh_bilingual=True)
+        process_files([str(self.eng_file)], 'eng', options)
+        process_files([str(self.jp_file)], 'jp', options)
+
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT key, column_name, eng_text, jp_text FROM _bilingual_lines WHERE table_name = %s",
+                       ('clsarc000_00021',))
+        lines = cursor.fetchall()
+        conn.close()
+        self.assertIn(('0', '_1', 'Hello,\nthere', 'こんにちは'), lines)
+        self.assertIn(('2', '_1', 'Bye', 'さようなら'), lines)
+
+    def test_run_policy_commits_only_after_all_files(self):
+        second_file = self.base_dir / 'eng' / 'quest' / '000' / 'ClsArc000_00022.csv'
+        second_file.write_text(ENG_CSV, encoding='utf-8')
+        for strategy, delta in (('row', False), ('copy', True)):
+            conn = connect_to_db()
+            conn.cursor().execute("DROP TABLE IF EXISTS ClsArc000_00021, ClsArc000_00022")
+            conn.commit()
+            conn.close()
+            options = argparse.Namespace(workers=1, batch_size=1, strategy=strategy, transaction='run', delta=delta,
+                                         metrics=mock.Mock())
+            visible = []
+
+            def record_table_metrics(metrics, table_name, *args):
+                conn = connect_to_db()
+                cursor = conn.cursor()
+                cursor.execute("SELECT to_regclass('clsarc000_00021'), to_regclass('clsarc000_00022')")
+                visible.append(cursor.fetchone())
+                conn.close()
+
+            with mock.patch('main.record_table_metrics', record_table_metrics):
+                process_files([str(self.eng_file), str(second_file)], 'eng', options)
+
+            self.assertEqual(visible, [(None, None), (None, None)], f"strategy {strategy}, delta {delta}")
+            self.assertEqual(len(fetch_rows('ClsArc000_00022')), 3)
+
+    def test_every_dataframe_strategy_stores_row_hashes(self):
+        data = self.df.iloc[2:]
+        for strategy in ('row', 'batch', 'copy'):
+            options = argparse.Namespace(workers=1, batch_size=2, strategy=strategy, transaction='file', delta=False)
+            process_files([str(self.eng_file)], 'eng', options)
+
+            conn = connect_to_db()
+            self.assertEqual(detect_drift(self.df, 'ClsArc000_00021', conn),
+                             {'added': [], 'changed': [], 'removed': []})
+            cursor = conn.cursor()
+            self.assertEqual(fetch_file_hash(cursor, 'ClsArc000_00021'),
+                             compute_rollup_hash(data, compute_row_hashes(data)))
+            conn.close()
+
+    def test_drift_without_row_hashes_is_an_error(self):
+        options = argparse.Namespace(workers=1, batch_size=2, strategy='passthrough', transaction='file', delta=False)
+        process_files([str(self.eng_file)], 'eng', options)
+
+        conn = connect_to_db()
+        with self.assertRaises(ValueError):
+            detect_drift(self.df, 'ClsArc000_00021', conn)
+        conn.close()
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestLoad)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
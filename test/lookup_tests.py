@@ -0,0 +1,98 @@
+import unittest
+
+from database_provider import connect_to_db
+from lookup_provider import LookupCache, DialogueLookup, notify_table_changed
+from test.pg_harness import PostgresTestCase
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLookupCache(unittest.TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LookupCache(max_entries=10, ttl=5, clock=clock)
+        cache.put('t', '0', {'_key': '0'})
+        self.assertEqual(cache.get('t', '0'), (True, {'_key': '0'}))
+        clock.now = 5
+        self.assertEqual(cache.get('t', '0'), (False, None))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LookupCache(max_entries=2)
+        cache.put('t', '0', None)
+        cache.put('t', '1', None)
+        cache.get('t', '0')
+        cache.put('t', '2', None)
+        self.assertEqual(list(cache.entries), [('t', '0'), ('t', '2')])
+
+    def test_invalidate_table(self):
+        cache = LookupCache()
+        cache.put('a', '0', None)
+        cache.put('b', '0', None)
+        cache.invalidate_table('a')
+        self.assertEqual(list(cache.entries), [('b', '0')])
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestLookupCache)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
+
+
+class TestLookup(PostgresTestCase):
+
+    def setUp(self):
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS ClsArc000_00021")
+        cursor.execute("CREATE TABLE ClsArc000_00021 (_key TEXT, _0 TEXT, _1 TEXT)")
+        cursor.execute("INSERT INTO ClsArc000_00021 VALUES ('0', 'TEXT_A', 'Hello'), ('1', 'TEXT_B', 'Bye')")
+        conn.commit()
+        conn.close()
+        self.lookup = DialogueLookup(max_connections=2)
+
+    def tearDown(self):
+        self.lookup.close()
+
+    def test_single_and_batched_lookups(self):
+        self.assertEqual(self.lookup.lookup('ClsArc000_00021', 0), {'_key': '0', '_0': 'TEXT_A', '_1': 'Hello'})
+        rows = self.lookup.lookup_many('ClsArc000_00021', ['1', '9'])
+        self.assertEqual(rows, {'1': {'_key': '1', '_0': 'TEXT_B', '_1': 'Bye'}, '9': None})
+        self.lookup.lookup('ClsArc000_00021', '1')
+        self.assertEqual(self.lookup.cache.hits, 1)
+
+    def test_notified_merge_invalidates_cached_rows(self):
+        self.lookup.lookup('ClsArc000_00021', '0')
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute('ALTER TABLE ClsArc000_00021 ADD COLUMN "_1_JP" TEXT')
+        cursor.execute("""UPDATE ClsArc000_00021 SET "_1_JP" = 'こんにちは' WHERE _key = '0'""")
+        notify_table_changed(cursor, 'ClsArc000_00021')
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self.lookup.lookup('ClsArc000_00021', '0')['_1_JP'], 'こんにちは')
+
+    def test_returned_connections_stay_open(self):
+        with self.lookup.connection() as first, self.lookup.connection() as second:
+            pass
+        self.assertFalse(first.closed or second.closed)
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestLookup)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
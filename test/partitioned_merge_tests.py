@@ -0,0 +1,136 @@
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import psycopg2
+
+import database_provider
+from database_provider import connect_to_db
+from main import process_files, process_translations
+from partitioned_merge_provider import planned_partitions, key_ranges, key_range_condition
+from sql_provider import translation_update_query as build_update_query
+from test.load_tests import fetch_rows
+from test.pg_harness import PostgresTestCase
+
+ENG_CSV = 'key,0,1\n#,,\nint32,str,str\n' + ''.join(f'{key},TEXT_{key},Line {key}\n' for key in range(10))
+JP_CSV = 'key,0,1\n#,,\nint32,str,str\n' + ''.join(f'{key},TEXT_{key},台詞{key}\n' for key in range(10))
+
+
+class TestKeyRanges(unittest.TestCase):
+
+    def test_ranges_cover_every_key(self):
+        self.assertEqual(key_ranges(['3', '6', '9']), [(None, '3'), ('3', '6'), ('6', None)])
+        self.assertEqual(key_ranges(['9']), [(None, None)])
+
+    def test_range_condition(self):
+        self.assertEqual(key_range_condition('_key', None, None), '')
+        self.assertEqual(key_range_condition('_key', '3', None), ' AND t."_key" > %(lower)s')
+        self.assertEqual(key_range_condition('_key', None, '3'), ' AND t."_key" <= %(upper)s')
+
+    def test_planned_partitions(self):
+        options = {'merge_partitions': 4, 'partition_rows': 100, 'transaction': 'file'}
+        self.assertEqual(planned_partitions(100, options), 4)
+        self.assertEqual(planned_partitions(99, options), 1)
+        self.assertEqual(planned_partitions(100, dict(options, transaction='run')), 1)
+        self.assertEqual(planned_partitions(10 ** 6, {}), 1)
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestKeyRanges)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
+
+
+class TestPartitionedMerge(PostgresTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.temp_dir.name)
+        self.eng_file = self.base_dir / 'eng' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        self.jp_file = self.base_dir / 'jp' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        for path, content in ((self.eng_file, ENG_CSV), (self.jp_file, JP_CSV)):
+            path.parent.mkdir(parents=True)
+            path.write_text(content, encoding='utf-8')
+        self.options = argparse.Namespace(workers=1, batch_size=100, strategy='copy', transaction='file',
+                                          delta=False, merge_partitions=3, partition_rows=0)
+        process_files([str(self.eng_file)], 'eng', self.options)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_ranges_are_merged_concurrently(self):
+        self.options.metrics = mock.Mock()
+        with mock.patch('main.record_table_metrics') as record_table_metrics:
+            process_translations({'jp': [str(self.jp_file)]}, self.options)
+
+        rows = fetch_rows('ClsArc000_00021', columns='_key, "_1_JP"')
+        self.assertEqual(rows, [(str(key), f'台詞{key}') for key in range(10)])
+        plan = record_table_metrics.call_args.args[-1]['partitions']
+        self.assertEqual(len(plan), 3)
+        self.assertEqual(sum(step['rows'] for step in plan), 10)
+        self.assertIsNone(plan[0]['lower'])
+        self.assertIsNone(plan[-1]['upper'])
+
+    def test_failed_range_rolls_back_every_range(self):
+        calls = []
+
+        def translation_update_query(*args):
+            calls.append(args)
+            return "SELECT 1/0" if len(calls) == 2 else build_update_query(*args)
+
+        self.options.retries = 0
+        with mock.patch('partitioned_merge_provider.translation_update_query', translation_update_query):
+            with self.assertRaises(psycopg2.Error):
+                process_translations({'jp': [str(self.jp_file)]}, self.options)
+
+        rows = fetch_rows('ClsArc000_00021', columns='_key, "_1_JP"')
+        self.assertEqual(rows, [(str(key), None) for key in range(10)])
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass('clsarc000_00021_translations_stage')")
+        self.assertIsNone(cursor.fetchone()[0])
+        conn.close()
+
+    def test_ranges_use_the_run_pool(self):
+        create_connection_pool = database_provider.create_connection_pool
+        pool_sizes = []
+
+        def recording_pool(max_connections, min_connections=1):
+            pool_sizes.append((min_connections, max_connections))
+            return create_connection_pool(max_connections, min_connections)
+
+        with mock.patch('database_provider.create_connection_pool', recording_pool):
+            process_translations({'jp': [str(self.jp_file)]}, self.options)
+
+        self.assertEqual(pool_sizes, [(3, 3)])
+        self.assertEqual(fetch_rows('ClsArc000_00021', columns='_key, "_1_JP"')[0], ('0', '台詞0'))
+
+    def test_broken_worker_connection_keeps_the_original_error(self):
+        def translation_update_query(*args):
+            # The first range runs on the worker's own connection.
+            if 'lower' not in args[-1]:
+                return "SELECT pg_terminate_backend(pg_backend_pid())"
+            return build_update_query(*args)
+
+        self.options.retries = 0
+        with mock.patch('partitioned_merge_provider.translation_update_query', translation_update_query):
+            with self.assertRaises(psycopg2.OperationalError):
+                process_translations({'jp': [str(self.jp_file)]}, self.options)
+
+        process_translations({'jp': [str(self.jp_file)]}, self.options)
+        rows = fetch_rows('ClsArc000_00021', columns='_key, "_1_JP"')
+        self.assertEqual(rows, [(str(key), f'台詞{key}') for key in range(10)])
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestPartitionedMerge)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
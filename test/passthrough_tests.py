@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from passthrough_provider import PassthroughReader
+
+CSV_BYTES = ('﻿key,0,1\n#,,\nint32,str,str\n0,TEXT_A,"Hello,\nthere ""friend"""\n1,TEXT_B,\n'
+             '#2,TEXT_C,commented out\n3,TEXT_D,Bye').encode('utf-8')
+
+
+class TestPassthrough(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_file = Path(self.temp_dir.name) / 'ClsArc000_00021.csv'
+        self.csv_file.write_bytes(CSV_BYTES)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_all(self, chunk_size, read_size):
+        reader = PassthroughReader(self.csv_file, chunk_size=chunk_size)
+        data = b''
+        while chunk := reader.read(read_size):
+            data += chunk
+        reader.close()
+        return reader, data
+
+    def test_header_is_parsed_and_metadata_rows_dropped(self):
+        reader, data = self.read_all(chunk_size=1024, read_size=-1)
+        self.assertEqual(reader.columns, ['key', '0', '1'])
+        self.assertEqual(data, b'0,TEXT_A,"Hello,\nthere ""friend"""\n1,TEXT_B,\n3,TEXT_D,Bye\n')
+        self.assertEqual((reader.rows, reader.skipped, reader.comments), (3, 3, 2))
+
+    def test_small_chunks_keep_quoted_line_breaks_in_their_record(self):
+        expected = self.read_all(chunk_size=1024, read_size=-1)[1]
+        for chunk_size in (1, 3, 7, 16):
+            self.assertEqual(self.read_all(chunk_size=chunk_size, read_size=5)[1], expected)
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestPassthrough)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
@@ -0,0 +1,141 @@
+"""Throwaway PostgreSQL servers for tests.
+
+start_test_database() prefers a private cluster created with initdb/pg_ctl in a temporary directory (found on
+PATH or in PG_BIN). initdb refuses to run as root, so as root (the usual case in CI containers) the cluster is
+run as the unprivileged PG_TEST_USER (nobody by default) through runuser. When the binaries or runuser are
+missing it falls back to a scratch database created on the server configured through the DB_* variables. Either way
+the DB_* variables are pointed at the throwaway database, so database_provider.connect_to_db() and the
+connection pool use it, and ThrowawayDatabase.stop() removes it and restores the environment.
+"""
+import os
+import pwd
+import shutil
+import socket
+import subprocess
+import tempfile
+import unittest
+
+import psycopg2
+
+DB_ENV_VARS = {'DB_NAME': 'dbname', 'DB_USER': 'user', 'DB_PASSWORD': 'password', 'DB_HOST': 'host',
+               'DB_PORT': 'port'}
+TEST_DB_NAME = 'dialogdb_test'
+# Account the private cluster runs as when the tests run as root.
+DEFAULT_PG_TEST_USER = 'nobody'
+
+
+def find_pg_binary(name):
+    pg_bin = os.environ.get('PG_BIN')
+    if pg_bin and os.path.isfile(os.path.join(pg_bin, name)):
+        return os.path.join(pg_bin, name)
+    return shutil.which(name)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+class ThrowawayDatabase:
+
+    def __init__(self):
+        self.saved_env = {name: os.environ.get(name) for name in DB_ENV_VARS}
+        self.data_dir = None
+        self.pg_ctl = None
+        self.run_as = []
+        self.admin_params = None
+        self.database = None
+
+    def start(self):
+        initdb, pg_ctl = find_pg_binary('initdb'), find_pg_binary('pg_ctl')
+        try:
+            if initdb and pg_ctl and (os.geteuid() != 0 or shutil.which('runuser')):
+                self._start_cluster(initdb, pg_ctl)
+            else:
+                self._use_configured_server()
+            self._create_database()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def _start_cluster(self, initdb, pg_ctl):
+        self.data_dir = tempfile.mkdtemp(prefix='dialogdb_pg_')
+        self.pg_ctl = pg_ctl
+        if os.geteuid() == 0:
+            user = pwd.getpwnam(os.environ.get('PG_TEST_USER', DEFAULT_PG_TEST_USER))
+            os.chown(self.data_dir, user.pw_uid, user.pw_gid)
+            self.run_as = ['runuser', '-u', user.pw_name, '--']
+        port = free_port()
+        data = os.path.join(self.data_dir, 'data')
+        subprocess.run(self.run_as + [initdb, '-D', data, '-U', 'postgres', '--auth=trust', '-E', 'UTF8', '--no-sync'],
+                       check=True, capture_output=True)
+        options = f"-p {port} -k {self.data_dir} -c listen_addresses=localhost -c fsync=off"
+        subprocess.run(self.run_as + [pg_ctl, '-D', data, '-o', options, '-l', os.path.join(self.data_dir, 'log'),
+                                      '-w', 'start'],
+                       check=True, capture_output=True)
+        self.admin_params = dict(dbname='postgres', user='postgres', password='', host='localhost', port=str(port))
+
+    def _use_configured_server(self):
+        self.admin_params = dict(dbname=self.saved_env['DB_NAME'] or 'postgres', user=self.saved_env['DB_USER'],
+                                 password=self.saved_env['DB_PASSWORD'], host=self.saved_env['DB_HOST'],
+                                 port=self.saved_env['DB_PORT'])
+        try:
+            psycopg2.connect(**self.admin_params).close()
+        except psycopg2.OperationalError as error:
+            raise unittest.SkipTest(f"No initdb/pg_ctl and no reachable DB_* server: {error}")
+
+    def _create_database(self):
+        self.database = f"{TEST_DB_NAME}_{os.getpid()}"
+        conn = psycopg2.connect(**self.admin_params)
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {self.database}")
+        cursor.execute(f"CREATE DATABASE {self.database} ENCODING 'UTF8' TEMPLATE template0")
+        conn.close()
+
+        params = dict(self.admin_params, dbname=self.database)
+        for name, parameter in DB_ENV_VARS.items():
+            value = params[parameter]
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def stop(self):
+        for name, value in self.saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+        if self.data_dir:
+            subprocess.run(self.run_as + [self.pg_ctl, '-D', os.path.join(self.data_dir, 'data'), '-m', 'immediate',
+                                          'stop'],
+                           capture_output=True)
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+        elif self.database and self.admin_params:
+            conn = psycopg2.connect(**self.admin_params)
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {self.database} WITH (FORCE)")
+            conn.close()
+
+
+def start_test_database():
+    return ThrowawayDatabase().start()
+
+
+class PostgresTestCase(unittest.TestCase):
+    """Runs the test class against its own throwaway database."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.database_server = start_test_database()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.database_server.stop()
+        super().tearDownClass()
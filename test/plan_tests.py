@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from metrics_provider import RunMetrics, recorded_throughput
+from plan_provider import SAMPLE_ROWS, build_plan, estimate_row_count, load_plan, read_csv_head, save_plan
+
+ENG_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,"Hello,\nthere"\n1,TEXT_B,Bye\n'
+JP_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,こんにちは\n1,TEXT_B,さようなら\n'
+
+
+class TestPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.temp_dir.name)
+        self.eng_file = self.base_dir / 'eng' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        self.jp_file = self.base_dir / 'jp' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        for path, content in ((self.eng_file, ENG_CSV), (self.jp_file, JP_CSV)):
+            path.parent.mkdir(parents=True)
+            path.write_text(content, encoding='utf-8')
+        self.metrics_file = str(self.base_dir / 'metrics.jsonl')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_estimate_row_count_counts_only_data_rows(self):
+        # The whole file fits in the sample: the quoted line break and the metadata rows don't count.
+        self.assertEqual(estimate_row_count(self.eng_file, read_csv_head(self.eng_file, SAMPLE_ROWS)), 2)
+
+    def test_estimate_row_count_extrapolates_from_the_sample(self):
+        big_file = self.base_dir / 'big.csv'
+        big_file.write_text('key,0,1\n#,,\nint32,str,str\n' +
+                            ''.join(f'{key:05},TEXT_{key:05},Line number {key:05}\n' for key in range(10000)),
+                            encoding='utf-8')
+        head = read_csv_head(big_file, SAMPLE_ROWS)
+        self.assertEqual(len(head), SAMPLE_ROWS + 1)
+        self.assertAlmostEqual(estimate_row_count(big_file, head), 10000, delta=500)
+
+    def test_offline_plan_creates_tables_and_jp_columns(self):
+        plan = build_plan({'eng': [str(self.eng_file)], 'jp': [str(self.jp_file)]}, {'workers': 1},
+                          metrics_file=self.metrics_file)
+
+        eng_step, jp_step = plan['steps']
+        self.assertEqual(eng_step['action'], 'create')
+        self.assertEqual(eng_step['columns'], ['_key', '_0', '_1'])
+        self.assertEqual(jp_step['columns_to_add'], ['_1_JP'])
+        self.assertIsNone(plan['estimated_seconds'])
+
+    def test_key_ranges_follow_the_rows_of_every_language(self):
+        de_file = self.base_dir / 'de' / 'quest' / '000' / 'ClsArc000_00021.csv'
+        de_file.parent.mkdir(parents=True)
+        de_file.write_text('key,0,1\n#,,\nint32,str,str\n0,TEXT_A,Guten Tag\n1,TEXT_B,Tschüss\n', encoding='utf-8')
+        options = {'workers': 1, 'transaction': 'file', 'merge_partitions': 2, 'partition_rows': 3}
+
+        plan = build_plan({'jp': [str(self.jp_file)]}, options, metrics_file=self.metrics_file)
+        self.assertEqual(plan['steps'][0]['partitions'], 1)
+        plan = build_plan({'jp': [str(self.jp_file)], 'de': [str(de_file)]}, options, metrics_file=self.metrics_file)
+        self.assertEqual([step['partitions'] for step in plan['steps']], [2, 2])
+
+    def test_plan_uses_recorded_throughput_and_round_trips(self):
+        metrics = RunMetrics('load')
+        for language, path in (('eng', self.eng_file), ('jp', self.jp_file)):
+            metrics.record_file(language, str(path), 'ClsArc000_00021', 5, os.path.getsize(path) / 100)
+        metrics.save(self.metrics_file)
+        self.assertAlmostEqual(recorded_throughput('eng', self.metrics_file), 100)
+
+        plan = build_plan({'eng': [str(self.eng_file)], 'jp': [str(self.jp_file)]}, {'workers': 2},
+                          metrics_file=self.metrics_file)
+        expected = (os.path.getsize(self.eng_file) + os.path.getsize(self.jp_file)) / 100 / 2
+        self.assertAlmostEqual(plan['estimated_seconds'], expected)
+
+        plan_file = str(self.base_dir / 'plan.json')
+        save_plan(plan, plan_file)
+        self.assertEqual(load_plan(plan_file), json.loads(json.dumps(plan)))
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestPlan)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
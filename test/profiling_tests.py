@@ -0,0 +1,80 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import nullcontext
+from unittest import mock
+
+import main
+from profiling_provider import Profiler, profile_phase
+
+
+def build_rows(count):
+    return [{'key': str(i), 'text': f"line {i}"} for i in range(count)]
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_phase_writes_report_pstats_and_collapsed_stacks(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = Profiler(output_dir, trace=True)
+            profiler.start()
+            with profiler.phase('eng:ClsArc000_00021'):
+                rows = build_rows(5000)
+            profiler.stop()
+
+            self.assertEqual(len(rows), 5000)
+            with open(os.path.join(output_dir, 'eng_ClsArc000_00021.txt'), encoding='utf-8') as handle:
+                report = handle.read()
+            self.assertIn('Top allocators:', report)
+            self.assertIn('build_rows', report)
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'profile.pstats')))
+            with open(os.path.join(output_dir, 'profile.folded'), encoding='utf-8') as handle:
+                stacks = handle.read().splitlines()
+            self.assertTrue(any('build_rows' in stack for stack in stacks))
+            self.assertTrue(all(stack.rsplit(' ', 1)[1].isdigit() for stack in stacks))
+
+    def test_concurrent_phases_run_one_at_a_time(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = Profiler(output_dir)
+            profiler.start()
+            spans = []
+
+            def profiled(name):
+                with profiler.phase(name):
+                    start_time = time.perf_counter()
+                    build_rows(20000)
+                    spans.append((start_time, time.perf_counter()))
+
+            threads = [threading.Thread(target=profiled, args=(f"eng:file_{i}",)) for i in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            profiler.stop()
+
+            spans.sort()
+            self.assertEqual(len(spans), 3)
+            self.assertTrue(all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:])))
+            self.assertEqual(len(os.listdir(output_dir)), 4)
+
+    def test_profiled_runs_use_one_worker(self):
+        with tempfile.TemporaryDirectory() as output_dir, mock.patch('main.process_csv_files') as process_csv_files, \
+                mock.patch('main.RunMetrics'):
+            main.main(['--profile', '--profile-dir', output_dir, 'run', '--workers', '4'])
+
+        self.assertEqual(process_csv_files.call_args.args[0].workers, 1)
+
+    def test_profile_phase_is_a_no_op_without_profiler(self):
+        self.assertIsInstance(profile_phase(argparse.Namespace(), 'eng:ClsArc000_00021'), nullcontext)
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestProfiling)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
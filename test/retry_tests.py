@@ -0,0 +1,62 @@
+import unittest
+
+import psycopg2
+import psycopg2.errors
+
+from retry_provider import is_transient_error, retry_transient, backoff_delay
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_transient_errors_are_recognised(self):
+        self.assertTrue(is_transient_error(psycopg2.OperationalError("server closed the connection unexpectedly")))
+        self.assertTrue(is_transient_error(psycopg2.errors.SerializationFailure()))
+        self.assertTrue(is_transient_error(psycopg2.errors.DeadlockDetected()))
+        self.assertTrue(is_transient_error(psycopg2.InterfaceError("connection already closed")))
+        self.assertFalse(is_transient_error(psycopg2.errors.UndefinedTable()))
+        self.assertFalse(is_transient_error(psycopg2.errors.UniqueViolation()))
+
+    def test_backoff_grows_exponentially(self):
+        self.assertTrue(0.5 <= backoff_delay(0, 1.0) <= 1.0)
+        self.assertTrue(4.0 <= backoff_delay(3, 1.0) <= 8.0)
+        self.assertTrue(backoff_delay(20, 1.0, max_delay=10.0) <= 10.0)
+
+    def test_retries_transient_errors_until_success(self):
+        calls = []
+        retried = []
+        delays = []
+
+        def work():
+            calls.append(1)
+            if len(calls) < 3:
+                raise psycopg2.errors.DeadlockDetected()
+            return 'done'
+
+        result = retry_transient(work, retries=3, base_delay=0.1, on_retry=retried.append, sleep=delays.append)
+        self.assertEqual(result, 'done')
+        self.assertEqual(len(retried), 2)
+        self.assertEqual(len(delays), 2)
+
+    def test_gives_up_after_retries_and_on_other_errors(self):
+        def deadlock():
+            raise psycopg2.errors.DeadlockDetected()
+
+        def missing_table():
+            raise psycopg2.errors.UndefinedTable()
+
+        delays = []
+        with self.assertRaises(psycopg2.errors.DeadlockDetected):
+            retry_transient(deadlock, retries=2, sleep=delays.append)
+        self.assertEqual(len(delays), 2)
+        with self.assertRaises(psycopg2.errors.UndefinedTable):
+            retry_transient(missing_table, retries=2, sleep=delays.append)
+        self.assertEqual(len(delays), 2)
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestRetry)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
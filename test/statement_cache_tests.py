@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import MagicMock
+
+from statement_cache_provider import StatementCache, statement_cache_for
+
+
+def build(query):
+    return lambda: (query, ['TEXT', 'TEXT'])
+
+
+class TestStatementCache(unittest.TestCase):
+
+    def test_statement_is_prepared_once_per_shape(self):
+        cache = StatementCache()
+        cursor = MagicMock()
+        for key in ('0', '1', '2'):
+            cache.execute(cursor, ('ClsArc000_00021', ('1',)), build('UPDATE t SET a = $1 WHERE k = $2'), ['こ', key])
+
+        queries = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertEqual(queries[0], 'PREPARE stmt_0 (TEXT, TEXT) AS UPDATE t SET a = $1 WHERE k = $2')
+        self.assertEqual(queries[1:], ['EXECUTE stmt_0 (%s, %s)'] * 3)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_least_recently_used_statement_is_deallocated(self):
+        cache = StatementCache(max_statements=2)
+        cursor = MagicMock()
+        cache.execute(cursor, ('a', ('1',)), build('UPDATE a'), ['x', '0'])
+        cache.execute(cursor, ('b', ('1',)), build('UPDATE b'), ['x', '0'])
+        cache.execute(cursor, ('a', ('1',)), build('UPDATE a'), ['x', '0'])
+        cache.execute(cursor, ('c', ('1',)), build('UPDATE c'), ['x', '0'])
+
+        cursor.execute.assert_any_call('DEALLOCATE stmt_1')
+        self.assertEqual(list(cache.statements), [('a', ('1',)), ('c', ('1',))])
+
+    def test_invalidate_table(self):
+        cache = StatementCache()
+        cursor = MagicMock()
+        cache.execute(cursor, ('a', ('1',)), build('UPDATE a'), ['x', '0'])
+        cache.execute(cursor, ('b', ('1',)), build('UPDATE b'), ['x', '0'])
+        cache.invalidate_table(cursor, 'a')
+
+        cursor.execute.assert_any_call('DEALLOCATE stmt_0')
+        self.assertEqual(list(cache.statements), [('b', ('1',))])
+
+    def test_one_cache_per_connection(self):
+        first, second = MagicMock(), MagicMock()
+        self.assertIs(statement_cache_for(first), statement_cache_for(first))
+        self.assertIsNot(statement_cache_for(first), statement_cache_for(second))
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestStatementCache)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
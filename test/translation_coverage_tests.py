@@ -0,0 +1,85 @@
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+
+from database_provider import connect_to_db
+from jptranslations_provider import UNUSED_PLACEHOLDER
+from row_hash_provider import FILE_HASH_TABLE, ensure_file_hash_table
+from main import process_files, process_translations
+from translation_coverage_provider import compute_coverage, materialize_coverage, COVERAGE_TABLE
+from test.pg_harness import PostgresTestCase
+
+ENG_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,Hello\n#1,TEXT_B,Cut\n2,TEXT_C,Bye\n'
+JP_CSV = 'key,0,1\n#,,\nint32,str,str\n0,TEXT_A,こんにちは\n#1,TEXT_B,カット\n2,TEXT_C,\n'
+
+
+class TestTranslationCoverage(PostgresTestCase):
+
+    def setUp(self):
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS ClsArc000_00021")
+        cursor.execute('CREATE TABLE ClsArc000_00021 (_key TEXT, _0 TEXT, _1 TEXT, "_1_JP" TEXT)')
+        cursor.execute("""
+            INSERT INTO ClsArc000_00021 VALUES
+                ('0', 'TEXT_A', 'Hello', 'こんにちは'),
+                ('1', 'TEXT_B', 'Bye', NULL),
+                ('2', 'TEXT_C', 'Unused', %s),
+                ('3', 'TEXT_D', 'NaN', NULL)
+        """, (f"{UNUSED_PLACEHOLDER}さようなら",))
+        cursor.execute("DROP TABLE IF EXISTS VoiceMan_02200")
+        cursor.execute("CREATE TABLE VoiceMan_02200 (_key TEXT, _0 TEXT, _1 TEXT)")
+        # The loader records the comment rows it skipped instead of storing them.
+        ensure_file_hash_table(cursor)
+        cursor.execute(f"DELETE FROM {FILE_HASH_TABLE}")
+        cursor.execute(f"INSERT INTO {FILE_HASH_TABLE} (table_name, row_count, comment_rows) "
+                       f"VALUES ('clsarc000_00021', 4, 1)")
+        conn.commit()
+        conn.close()
+
+    def test_coverage_is_counted_per_column(self):
+        conn = connect_to_db()
+        coverage = compute_coverage(conn)
+        conn.close()
+
+        self.assertEqual(coverage, [{
+            'table_name': 'clsarc000_00021', 'column_name': '_1', 'total_rows': 4, 'comment_rows': 1,
+            'eng_rows': 3, 'jp_rows': 2, 'placeholder_rows': 1,
+        }])
+
+    def test_materialize_replaces_only_the_given_tables(self):
+        conn = connect_to_db()
+        self.assertEqual(materialize_coverage(conn), 1)
+        self.assertEqual(materialize_coverage(conn, ['ClsArc000_00021']), 1)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT table_name, column_name, jp_rows FROM {COVERAGE_TABLE}")
+        self.assertEqual(cursor.fetchall(), [('clsarc000_00021', '_1', 2)])
+        conn.close()
+
+    def test_loaded_comment_rows_are_counted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            eng_file = Path(temp_dir) / 'eng' / 'ClsArc000_00021.csv'
+            jp_file = Path(temp_dir) / 'jp' / 'ClsArc000_00021.csv'
+            for path, content in ((eng_file, ENG_CSV), (jp_file, JP_CSV)):
+                path.parent.mkdir(parents=True)
+                path.write_text(content, encoding='utf-8')
+            options = argparse.Namespace(workers=1, batch_size=100, strategy='copy', transaction='file', delta=False)
+            process_files([str(eng_file)], 'eng', options)
+            process_translations({'jp': [str(jp_file)]}, options)
+
+        conn = connect_to_db()
+        coverage = compute_coverage(conn, ['ClsArc000_00021'])
+        conn.close()
+
+        self.assertEqual([(entry['total_rows'], entry['comment_rows'], entry['jp_rows']) for entry in coverage],
+                         [(2, 2, 1)])
+
+    @staticmethod
+    def run_all_tests():
+        test_loader = unittest.TestLoader()
+        test_suite = test_loader.loadTestsFromTestCase(TestTranslationCoverage)
+
+        test_runner = unittest.TextTestRunner()
+        result = test_runner.run(test_suite)
+        return result
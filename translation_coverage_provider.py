@@ -0,0 +1,142 @@
+from jptranslations_provider import UNUSED_PLACEHOLDER
+from row_hash_provider import FILE_HASH_TABLE
+
+COVERAGE_TABLE = "_translation_coverage"
+JP_SUFFIX = "_JP"
+# Tables aggregated per statement; one UNION ALL per group keeps round trips low across thousands of tables.
+TABLES_PER_QUERY = 200
+COVERAGE_COLUMNS = ('table_name', 'column_name', 'total_rows', 'comment_rows', 'eng_rows', 'jp_rows',
+                    'placeholder_rows')
+
+
+def fetch_translated_tables(cursor, tables=None):
+    """Return {table_name: (key_column, [(eng_column, jp_column), ...], all columns)} for every table with _JP
+    columns."""
+    cursor.execute("""
+        SELECT table_name, column_name FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE table_schema = 'public' AND left(table_name, 1) <> '_'
+        ORDER BY table_name, ordinal_position
+    """)
+    columns = {}
+    for table_name, column_name in cursor.fetchall():
+        columns.setdefault(table_name, []).append(column_name)
+
+    wanted = {table.lower() for table in tables} if tables else None
+    translated = {}
+    for table_name, table_columns in columns.items():
+        if wanted is not None and table_name not in wanted:
+            continue
+        pairs = [(column[:-len(JP_SUFFIX)].lower(), column)
+                 for column in table_columns if column.endswith(JP_SUFFIX)]
+        if pairs:
+            translated[table_name] = (table_columns[0], pairs, set(table_columns))
+    return translated
+
+
+def table_coverage_query(table_name, pairs, existing_columns, recorded_comments):
+    """One aggregate scan of a table, unpivoted to a row per translated column.
+
+    Comment rows never reach the table; their count comes from what the loader recorded in the file hash table,
+    when recorded_comments is set.
+    """
+    comment_rows = "0"
+    if recorded_comments:
+        comment_rows = (f"COALESCE((SELECT comment_rows FROM {FILE_HASH_TABLE} "
+                        f"WHERE table_name = '{table_name}'), 0)")
+    aggregates = [
+        "count(*) AS total_rows",
+        f"{comment_rows} AS comment_rows",
+    ]
+    values = []
+    for index, (eng_column, jp_column) in enumerate(pairs):
+        if eng_column in existing_columns:
+            aggregates.append(f'count(*) FILTER (WHERE "{eng_column}" IS NOT NULL '
+                              f'AND "{eng_column}" <> \'NaN\') AS eng_{index}')
+        else:
+            aggregates.append(f"0 AS eng_{index}")
+        aggregates.append(f'count("{jp_column}") AS jp_{index}')
+        aggregates.append(f'count(*) FILTER (WHERE strpos("{jp_column}", %(placeholder)s) > 0) '
+                          f'AS placeholder_{index}')
+        values.append(f"('{eng_column}', a.eng_{index}, a.jp_{index}, a.placeholder_{index})")
+
+    return f"""
+        SELECT '{table_name}'::text, v.column_name, a.total_rows, a.comment_rows, v.eng_rows, v.jp_rows,
+               v.placeholder_rows
+        FROM (SELECT {', '.join(aggregates)} FROM "{table_name}") a
+        CROSS JOIN LATERAL (VALUES {', '.join(values)}) v(column_name, eng_rows, jp_rows, placeholder_rows)
+    """
+
+
+def coverage_queries(cursor, tables=None):
+    translated = fetch_translated_tables(cursor, tables)
+    cursor.execute("SELECT to_regclass(%s)", (FILE_HASH_TABLE,))
+    recorded_comments = cursor.fetchone()[0] is not None
+    table_queries = [table_coverage_query(table_name, pairs, existing_columns, recorded_comments)
+                     for table_name, (_, pairs, existing_columns) in sorted(translated.items())]
+    for start in range(0, len(table_queries), TABLES_PER_QUERY):
+        yield '\nUNION ALL\n'.join(table_queries[start:start + TABLES_PER_QUERY])
+
+
+def compute_coverage(conn, tables=None):
+    """Count per table and column the ENG lines, JP lines, comment rows and JP cells with the unused placeholder.
+
+    Everything is aggregated in SQL; nothing is re-read from the CSV files. The comment rows are the ones the
+    loader skipped in the table's ENG file. Returns a list of dicts.
+    """
+    cursor = conn.cursor()
+    coverage = []
+    for query in coverage_queries(cursor, tables):
+        cursor.execute(query, {'placeholder': UNUSED_PLACEHOLDER})
+        coverage += [dict(zip(COVERAGE_COLUMNS, row)) for row in cursor.fetchall()]
+    cursor.close()
+    return coverage
+
+
+def ensure_coverage_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {COVERAGE_TABLE} (
+            table_name TEXT,
+            column_name TEXT,
+            total_rows BIGINT,
+            comment_rows BIGINT,
+            eng_rows BIGINT,
+            jp_rows BIGINT,
+            placeholder_rows BIGINT,
+            computed_at TIMESTAMPTZ DEFAULT now(),
+            PRIMARY KEY (table_name, column_name)
+        )
+    """)
+
+
+def materialize_coverage(conn, tables=None):
+    """Recompute the coverage of the given tables (all translated tables by default) into the summary table."""
+    cursor = conn.cursor()
+    ensure_coverage_table(cursor)
+    if tables:
+        cursor.execute(f"DELETE FROM {COVERAGE_TABLE} WHERE table_name = ANY(%s)",
+                       ([table.lower() for table in tables],))
+    else:
+        cursor.execute(f"DELETE FROM {COVERAGE_TABLE}")
+    inserted = 0
+    for query in coverage_queries(cursor, tables):
+        cursor.execute(f"INSERT INTO {COVERAGE_TABLE} ({', '.join(COVERAGE_COLUMNS)}) {query}",
+                       {'placeholder': UNUSED_PLACEHOLDER})
+        inserted += cursor.rowcount
+    conn.commit()
+    cursor.close()
+    print(f"Materialized {inserted} coverage rows into {COVERAGE_TABLE}.")
+    return inserted
+
+
+def print_coverage(coverage):
+    totals = {'eng_rows': 0, 'jp_rows': 0, 'placeholder_rows': 0}
+    for entry in coverage:
+        percentage = 100 * entry['jp_rows'] / entry['eng_rows'] if entry['eng_rows'] else 0
+        print(f"{entry['table_name']}.{entry['column_name']}: {entry['jp_rows']}/{entry['eng_rows']} "
+              f"({percentage:.1f}%), {entry['comment_rows']} comment rows, "
+              f"{entry['placeholder_rows']} unused placeholders")
+        for name in totals:
+            totals[name] += entry[name]
+    percentage = 100 * totals['jp_rows'] / totals['eng_rows'] if totals['eng_rows'] else 0
+    print(f"Total: {totals['jp_rows']}/{totals['eng_rows']} ({percentage:.1f}%), "
+          f"{totals['placeholder_rows']} unused placeholders")